@@ -1,3 +1,5 @@
+from emission_engine import emissions_year_by_year, initial_rate, pre_correction, rate_trajectory
+
 # Global budget for reaching 1.7 °C with a probability of 83 % is 550 Gt CO2.
 # Deducting the emissions from 2020 to 2024 to get a budget for 2025.
 # Using the factor of 0.887 (Share of CO2 on German greenhouse gas (GHG) emissions) to get a GHG budget instead of CO2 budget.
@@ -14,6 +16,9 @@ rr = 0.01   # Yearly renovation rate
 
 year_GHG_neutrality = 2045 # Year of GHG neutrality in Germany
 
+# The rates may also change over time: one rate per year from 2025 to 'year_GHG_neutrality', e.g.
+# rr = rate_trajectory(range(2025, year_GHG_neutrality + 1), [2025, 2030], [0.01, 0.02])
+
 
 # Residential net room area in m²: First the residential living area minus residential areas in non-residential buildings 
 # (already included in non-residential net room area) (Destatis (2024), Destatis (2024b)). Only data for the living area is 
@@ -41,27 +46,9 @@ def calculate_emissions_year_by_year():
     #   - Operational emissions
     #   - Embodied emissions
 
-    # 1) Pre-correction for the period 2021–2025
-    years_pre = 2025 - 2021  # Number of years before 2025 we want to account for
-    Ae_temp = Ae_initial
-
-    for _ in range(years_pre):
-        # Estimate new construction and demolition in each of those pre-years
-        pre_An = rn * Ae_temp  # New construction
-        pre_Ad = rd * Ae_temp  # Demolition
-        Ae_temp += pre_An - pre_Ad
-
-    # Building area in 2025 (after pre-correction)
-    Ae_2025 = Ae_temp
-
-    # 2) Initialize lists to store yearly results
-    years = list(range(2025, year_GHG_neutrality + 1))  # from 2025 to 'year_GHG_neutrality'
-    Ae_list = []      # Total building area per year
-    Anew_list = []    # Newly added (An + Ar) building area per year
-    op_em_list = []   # Operational emissions per year
-    emb_em_list = []  # Embodied emissions per year
-
-    Ae_current = Ae_2025
+    # 1) Pre-correction for the period 2021–2025 with the rates of 2025 (memoized for each (rn, rd) pair, see emission_engine.py)
+    # Building area in 2025 (after pre-correction):
+    Ae_2025 = pre_correction(initial_rate(rn), initial_rate(rd), Ae_initial)
 
     # Total budget for operational GHG emissions in Germany
     share_operational = GB * Fn * Fb * Fo * 1e12  # kg CO2e (instead of Gt)
@@ -69,32 +56,12 @@ def calculate_emissions_year_by_year():
     # Total budget for embodied GHG emissions in Germany 
     share_embodied = GB * Fn * Fb * Fe * 1e12  # kg CO2e (instead of Gt)
 
-    for year in years:
-        # Annual new construction, demolition, and renovation area
-        An = rn * Ae_current
-        Ad = rd * Ae_current
-        Ar = rr * Ae_current
-
-        # Update total building area for the next year
-        Ae_current += An - Ad
-
-        # Newly added area = new construction + renovation
-        A_new = An + Ar
-
-        # Operational emissions per year for the existing total building area per m²
-        # Divided by 21 to spread over 2025–2045 (21 years, including 2025), as an example
-        E_op = share_operational / (year_GHG_neutrality + 1 - 2025) / Ae_current  # kg CO2e per year and per m²
-
-        # Embodied emissions per year  per m² (new construction + renovation) and distributed over a life-cycle of 50 years
-        E_emb = share_embodied / (year_GHG_neutrality + 1 - 2025) / A_new / 50  # kg CO2e per year and per m²
-
-        # Store values in the lists
-        Ae_list.append(Ae_current)
-        Anew_list.append(A_new)
-        op_em_list.append(E_op)
-        emb_em_list.append(E_emb)
+    # 2) Calculation of all years from 2025 to 'year_GHG_neutrality' at once (closed form, see emission_engine.py)
+    years, Ae, A_new, E_op, E_emb = emissions_year_by_year(
+        share_operational, share_embodied, Ae_2025, year_GHG_neutrality, rn, rr, rd
+    )
 
-    return years, Ae_list, Anew_list, op_em_list, emb_em_list
+    return years, Ae, A_new, E_op, E_emb
 
 
 # Call the function
@@ -0,0 +1,146 @@
+import numpy as np
+
+import emission_engine
+from emission_engine import base_year, budget_shares, masked_sum, pre_correction
+
+# Optional vintage-cohort model of the building stock. Instead of one aggregate area with a flat demolition rate,
+# the area is tracked by construction vintage (age 0 .. n_vintages - 1, the last age class is open-ended):
+#   - demolition follows a Weibull survival curve, so old buildings are demolished more often than new ones
+#   - renovation is routed to the age classes with renovation weights; rr is the renovation rate of the stock
+#     of 2025, later the renovated area follows the ageing of the stock
+#   - new construction (rn of the total area per year) enters as the youngest vintage
+# Every year all cohorts are shifted by one age class at once, for all scenarios together. Only the current
+# cohort state (scenarios x vintages) and the yearly totals are kept, and the scenarios are processed in chunks,
+# so the memory stays bounded for large runs (e.g. 100 vintages x 30 years x 10,000 scenarios).
+
+# Number of tracked vintages (ages 0 .. 99, the last age class collects all older buildings)
+n_vintages = 100
+
+# Weibull survival curve of buildings: S(age) = exp(-(age / scale)**shape) (illustrative values)
+survival_shape = 2.5
+survival_scale = 120
+
+
+def weibull_survival(ages, shape=survival_shape, scale=survival_scale):
+
+    # Share of the buildings that are still in use at the given ages
+    return np.exp(-(np.asarray(ages, dtype=float) / scale) ** shape)
+
+
+def weibull_hazard(n_vintages=n_vintages, shape=survival_shape, scale=survival_scale):
+
+    # Share of the area of every age class that is demolished within one year: 1 - S(age + 1) / S(age).
+    # shape and scale may be arrays (one survival curve per scenario); the result is (... x n_vintages).
+    ages = np.arange(n_vintages)
+    shape = np.asarray(shape, dtype=float)[..., None]
+    scale = np.asarray(scale, dtype=float)[..., None]
+    return -np.expm1((ages / scale) ** shape - ((ages + 1) / scale) ** shape)
+
+
+def age_distribution(hazard):
+
+    # Age distribution of a stock with constant inflow: the share of every age class is proportional to the
+    # probability of surviving up to that age. The open last age class holds all older buildings.
+    survival = np.cumprod(1 - hazard, axis=-1)
+    survival = np.concatenate([np.ones_like(survival[..., :1]), survival[..., :-1]], axis=-1)
+    survival[..., -1] /= hazard[..., -1]
+    return survival / survival.sum(axis=-1, keepdims=True)
+
+
+def age_class_weights(edges, weights, n_vintages=n_vintages):
+
+    # Weights per age from weights per age class, e.g. renovation only for buildings older than 20 years:
+    #   age_class_weights([0, 20, 40], [0, 1, 2]) -> 0 for ages 0-19, 1 for 20-39, 2 for 40 and older
+    return np.asarray(weights, dtype=float)[..., np.searchsorted(edges, np.arange(n_vintages), side='right') - 1]
+
+
+# Renovation weights per age: no renovation within the first 20 years
+renovation_weights = age_class_weights([0, 20], [0, 1])
+
+
+def cohort_trajectory(Ae_2025, rn, rr, hazard, initial_distribution, renovation_weights, n_years):
+
+    # Building area per year of the cohort model for a batch of scenarios.
+    #   - Ae_2025:              Area in 2025 (scenarios)
+    #   - rn, rr:               New-built and renovation rate relative to the total area (scenarios)
+    #   - hazard:               Demolition share per age (n_vintages or scenarios x n_vintages)
+    #   - initial_distribution: Age distribution of the area in 2025 (n_vintages or scenarios x n_vintages)
+    #   - renovation_weights:   Relative renovation intensity per age (n_vintages or scenarios x n_vintages);
+    #                           they are scaled so that the stock of 2025 is renovated at the rate rr
+    # Returns (scenarios x n_years) arrays like stock_trajectory():
+    #   - Ae:    Total building area at the end of each year
+    #   - A_new: Newly added area (new construction + renovation)
+    #   - A_dem: Demolished area
+
+    Ae_2025, rn, rr = (np.atleast_1d(np.asarray(x, dtype=float)) for x in (Ae_2025, rn, rr))
+    n_scenarios = np.broadcast_shapes(Ae_2025.shape, rn.shape, rr.shape, np.shape(hazard)[:-1])[0]
+
+    stock = Ae_2025[:, None] * np.broadcast_to(initial_distribution, (n_scenarios, np.shape(hazard)[-1]))
+    survival = 1 - np.asarray(hazard)
+
+    # Renovation rate per age
+    renovation = np.broadcast_to(renovation_weights, stock.shape)
+    renovation = rr[:, None] * renovation / np.sum(initial_distribution * renovation, axis=1, keepdims=True)
+
+    Ae = np.empty((n_scenarios, n_years))
+    A_new = np.empty((n_scenarios, n_years))
+    A_dem = np.empty((n_scenarios, n_years))
+
+    for t in range(n_years):
+        total = stock.sum(axis=1)
+
+        # Renovation of the existing area by age
+        renovated = np.sum(stock * renovation, axis=1)
+
+        # Demolition by age, then all cohorts become one year older (the open last age class keeps its area)
+        survivors = stock * survival
+        A_dem[:, t] = total - survivors.sum(axis=1)
+        oldest = survivors[:, -1].copy()
+        stock = np.empty_like(survivors)
+        stock[:, 1:] = survivors[:, :-1]
+        stock[:, -1] += oldest
+
+        # New construction enters as the youngest vintage
+        stock[:, 0] = rn * total
+
+        Ae[:, t] = total - A_dem[:, t] + stock[:, 0]
+        A_new[:, t] = stock[:, 0] + renovated
+
+    return Ae, A_new, A_dem
+
+
+def cohort_emissions(GB, Fn, year_GHG_neutrality, rn, rr, shape=survival_shape, scale=survival_scale,
+                     renovation_weights=renovation_weights, initial_distribution=None, Fb=emission_engine.Fb,
+                     Fe=emission_engine.Fe, Ae_initial=emission_engine.Ae_initial, lifecycle=emission_engine.lifecycle,
+                     chunk_size=2**12):
+
+    # Average operational and embodied emissions in kg CO2e per year and per m² (as calculate_emissions_batch())
+    # with the cohort model instead of the flat demolition rate. GB, Fn, year_GHG_neutrality, rn, rr, shape and
+    # scale may be arrays of scenarios. The initial age distribution defaults to the steady state of the survival
+    # curve, and the pre-correction for 2021–2025 uses the demolition rate that this distribution implies.
+    # The scenarios are evaluated in chunks of chunk_size. Every chunk runs up to its latest year of climate
+    # neutrality, and the years after the neutrality of a scenario are masked as in emissions_matrix().
+
+    share_operational, share_embodied = budget_shares(np.asarray(GB, dtype=float), np.asarray(Fn, dtype=float), Fb, Fe)
+    parameters = np.broadcast_arrays(year_GHG_neutrality, rn, rr, shape, scale, share_operational, share_embodied)
+    year_GHG_neutrality, rn, rr, shape, scale, share_operational, share_embodied = (np.ravel(x) for x in parameters)
+    n_years = year_GHG_neutrality + 1 - base_year
+
+    average_op_em = np.empty(len(rn))
+    average_emb_em = np.empty(len(rn))
+    for start in range(0, len(rn), chunk_size):
+        chunk = slice(start, min(start + chunk_size, len(rn)))
+
+        hazard = weibull_hazard(np.shape(renovation_weights)[-1], shape[chunk], scale[chunk])
+        distribution = age_distribution(hazard) if initial_distribution is None else initial_distribution
+        rd = np.sum(np.broadcast_to(distribution, hazard.shape) * hazard, axis=1)
+        Ae_2025 = pre_correction(rn[chunk], rd, Ae_initial, use_cache=False)
+
+        years = np.arange(base_year, int(np.max(year_GHG_neutrality[chunk])) + 1)
+        valid = years <= year_GHG_neutrality[chunk, None]
+
+        Ae, A_new, _ = cohort_trajectory(Ae_2025, rn[chunk], rr[chunk], hazard, distribution, renovation_weights, len(years))
+        average_op_em[chunk] = share_operational[chunk] / n_years[chunk]**2 * masked_sum(1 / Ae, valid)
+        average_emb_em[chunk] = share_embodied[chunk] / n_years[chunk]**2 / lifecycle * masked_sum(1 / A_new, valid)
+
+    return average_op_em.reshape(parameters[0].shape)[()], average_emb_em.reshape(parameters[0].shape)[()]
@@ -0,0 +1,353 @@
+from functools import lru_cache
+
+import numpy as np
+
+# Array-based engine for the static budget calculation. With constant rates rn and rd the building stock
+# grows geometrically, so the yearly loop of the static scripts can be replaced by closed-form expressions
+# that build the whole horizon as NumPy arrays in one shot.
+
+# First year of the budget period
+base_year = 2025
+
+# Life-cycle in years over which embodied emissions are distributed
+lifecycle = 50
+
+# Number of years before 2025 that are accounted for in the pre-correction (2021–2025)
+years_pre = 2025 - 2021
+
+# Model constants (see calculations_year_by_year.py and parallel coordinates.py for the sources)
+budget_deduction = 185  # Global emissions from 2020 to 2024 in Gt CO2
+co2_share = 0.887       # Share of CO2 on German greenhouse gas (GHG) emissions
+Fb = 0.303              # Share of the building sector on national emissions in Germany
+Fe = 0.3707             # Average share of embodied emissions on the emissions of the building sector
+Fo = 1 - Fe             # Average share of operational emissions on the emissions of the building sector
+
+# Net room area of the German building stock that is relevant to the GEG in m² (residential + non-residential)
+living_area = 4024768000                    # Residential living area in m²
+living_area_nonresidential = 127039000      # Residential living area in non-residential buildings in m²
+gross_floor_factor = 1.87                   # Living area -> gross floor area
+net_room_factor = 0.83                      # Gross floor area -> net room area (deduction of the construction area)
+Ae_residential = (living_area - living_area_nonresidential) * gross_floor_factor * net_room_factor
+Ae_nonresidential = 3073000000
+Ae_initial = Ae_residential + Ae_nonresidential
+
+
+def model_constants(Fb=Fb, Fe=Fe, Ae_initial=Ae_initial):
+
+    # All constants that the results depend on (e.g. as part of a cache key), including overridden values
+    return {
+        'base_year': base_year,
+        'lifecycle': lifecycle,
+        'years_pre': years_pre,
+        'budget_deduction': budget_deduction,
+        'co2_share': co2_share,
+        'Fb': Fb,
+        'Fe': Fe,
+        'living_area': living_area,
+        'living_area_nonresidential': living_area_nonresidential,
+        'gross_floor_factor': gross_floor_factor,
+        'net_room_factor': net_room_factor,
+        'Ae_nonresidential': Ae_nonresidential,
+        'Ae_initial': Ae_initial,
+    }
+
+
+def stock_trajectory(Ae_2025, rn, rr, rd, n_years):
+
+    # Calculates the building area per year in closed form.
+
+    # The year-by-year loop updates the area with Ae_current += rn * Ae_current - rd * Ae_current,
+    # so after t years the area is Ae_2025 * (1 + rn - rd)**t.
+    #   - Ae:    Total building area at the end of each year (after new construction and demolition)
+    #   - A_new: Newly added area (new construction + renovation), based on the area at the start of each year
+
+    # The rates may also change over time: arrays with one rate per year on the last axis (e.g. a batch of
+    # pathways with the shape (pathways x n_years)). The area then follows the cumulative product of the
+    # yearly growth factors. Constant rates of many scenarios have a year axis of length 1 (e.g. rn[:, None]).
+    if any(np.shape(rate)[-1:] not in ((), (1,)) for rate in (rn, rr, rd)):
+        return _stock_trajectory_varying(Ae_2025, rn, rr, rd, n_years)
+
+    t = np.arange(n_years)
+    growth = 1 + rn - rd
+
+    Ae_start = Ae_2025 * growth ** t    # Area at the start of each year
+    Ae = Ae_start * growth              # Area after the update of each year
+    A_new = (rn + rr) * Ae_start        # An + Ar
+
+    return Ae, A_new
+
+
+def _stock_trajectory_varying(Ae_2025, rn, rr, rd, n_years):
+
+    # Building area per year for time-varying rates (scalars are used for every year)
+    for rate in (rn, rr, rd):
+        if np.ndim(rate) > 0 and np.shape(rate)[-1] != n_years:
+            raise ValueError(f"Rate pathways cover {np.shape(rate)[-1]} years, expected {n_years}")
+    rn, rr, rd = np.broadcast_arrays(*(np.asarray(rate, dtype=float) for rate in (rn, rr, rd)), np.empty(n_years))[:3]
+
+    growth = 1 + rn - rd
+    Ae = np.asarray(Ae_2025, dtype=float)[..., None] * np.cumprod(growth, axis=-1)
+    Ae_start = Ae / growth
+    A_new = (rn + rr) * Ae_start
+
+    return Ae, A_new
+
+
+def initial_rate(rate):
+
+    # Rate of the first year of a pathway (a constant rate is returned unchanged).
+    # The pre-correction for 2021–2025 uses the rates of 2025.
+    return np.asarray(rate)[..., 0] if np.ndim(rate) > 0 else rate
+
+
+def rate_trajectory(years, anchor_years, anchor_rates):
+
+    # Rate pathways that are linear between anchor points and constant before the first and after the last
+    # anchor, e.g. a renovation rate rising from 1 % in 2025 to 2 % in 2030:
+    #   rate_trajectory(np.arange(2025, 2046), [2025, 2030], [0.01, 0.02])
+    # anchor_rates may hold many pathways (pathways x anchors); the result has the shape (pathways x years).
+    # The interpolation weights are the same for all pathways, so the batch is one matrix product.
+
+    years = np.asarray(years, dtype=float)
+    anchor_years = np.asarray(anchor_years, dtype=float)
+    anchor_rates = np.asarray(anchor_rates, dtype=float)
+    if anchor_rates.shape[-1] != len(anchor_years):
+        raise ValueError(f"Got {anchor_rates.shape[-1]} rates for {len(anchor_years)} anchor years")
+
+    weights = np.zeros((len(years), len(anchor_years)))
+    clipped = np.clip(years, anchor_years[0], anchor_years[-1])
+    upper = np.clip(np.searchsorted(anchor_years, clipped, side='right'), 1, len(anchor_years) - 1)
+    lower = upper - 1
+    if len(anchor_years) == 1:
+        weights[:, 0] = 1
+    else:
+        fraction = (clipped - anchor_years[lower]) / (anchor_years[upper] - anchor_years[lower])
+        rows = np.arange(len(years))
+        weights[rows, lower] = 1 - fraction
+        weights[rows, upper] += fraction
+
+    return anchor_rates @ weights.T
+
+
+def emissions_year_by_year(share_operational, share_embodied, Ae_2025, year_GHG_neutrality, rn, rr, rd):
+
+    # Calculates building area and emissions per year from 2025 up to 'year_GHG_neutrality' as arrays.
+    # Returns the same values as the year-by-year loop:
+    #   - Total building area
+    #   - Newly added building area
+    #   - Operational emissions in kg CO2e per year and per m²
+    #   - Embodied emissions in kg CO2e per year and per m²
+
+    # rn, rr and rd may be constant or pathways with one rate per year (see stock_trajectory)
+
+    n_years = year_GHG_neutrality + 1 - base_year
+    years = np.arange(base_year, year_GHG_neutrality + 1)
+
+    Ae, A_new = stock_trajectory(Ae_2025, rn, rr, rd, n_years)
+
+    # Operational emissions per year for the existing total building area per m²
+    E_op = share_operational / n_years / Ae
+
+    # Embodied emissions per year per m² (new construction + renovation) distributed over the life-cycle
+    E_emb = share_embodied / n_years / A_new / lifecycle
+
+    return years, Ae, A_new, E_op, E_emb
+
+
+# Maximum number of (rn, rd) pairs kept in the pre-correction cache
+pre_correction_cache_size = 4096
+
+
+def _pre_correction_growth(rn, rd):
+
+    # Growth of the building area over the pre-years 2021–2025 (works for scalars and arrays)
+    Ae_temp = 1.0
+    for _ in range(years_pre):
+        # Estimate new construction and demolition in each of those pre-years
+        pre_An = rn * Ae_temp  # New construction
+        pre_Ad = rd * Ae_temp  # Demolition
+        Ae_temp = Ae_temp + pre_An - pre_Ad
+    return Ae_temp
+
+
+@lru_cache(maxsize=pre_correction_cache_size)
+def _pre_correction_factor(rn, rd):
+
+    # The pre-correction only depends on rn and rd, so it is memoized per pair and shared by all entry points
+    return _pre_correction_growth(rn, rd)
+
+
+def pre_correction(rn, rd, Ae_initial=Ae_initial, use_cache=True):
+
+    # Building area in 2025 after the pre-correction for the period 2021–2025.
+    # rn and rd may be arrays; the distinct values of rn and rd are combined into a small table that is filled
+    # from the cache (e.g. 6 x 10 entries for the sweep) and broadcast back to the shape of the inputs.
+    # If the table would be larger than the cache (e.g. random sampling), the pre-year loop is evaluated on the
+    # arrays directly instead. Scalar rates return a scalar area.
+    # Callers with continuous rates that are only used once (the bisection midpoints of the inverse solver, the
+    # implied demolition rates of the cohort model) pass use_cache=False, so they do not evict the table.
+    rn, rd = np.asarray(rn, dtype=float), np.asarray(rd, dtype=float)
+
+    if not use_cache:
+        return (Ae_initial * _pre_correction_growth(rn, rd))[()]
+
+    rn_values, rn_codes = np.unique(rn, return_inverse=True)
+    rd_values, rd_codes = np.unique(rd, return_inverse=True)
+
+    if len(rn_values) * len(rd_values) > pre_correction_cache_size:
+        growth = _pre_correction_growth(rn, rd)
+    else:
+        table = np.array([[_pre_correction_factor(float(rn_i), float(rd_i)) for rd_i in rd_values] for rn_i in rn_values])
+        growth = table[rn_codes.reshape(rn.shape), rd_codes.reshape(rd.shape)]
+
+    return (Ae_initial * growth)[()]
+
+
+def budget_shares(GB, Fn, Fb=Fb, Fe=Fe, budget_deduction=budget_deduction, co2_share=co2_share):
+
+    # Total budgets for operational and embodied GHG emissions in Germany in kg CO2e (instead of Gt),
+    # based on the global CO2 budget GB in Gt before deducting the emissions from 2020 to 2024
+    GB_GHG = (GB - budget_deduction) / co2_share
+    share_operational = GB_GHG * Fn * Fb * (1 - Fe) * 1e12
+    share_embodied = GB_GHG * Fn * Fb * Fe * 1e12
+    return share_operational, share_embodied
+
+
+def _geometric_sum(rn, rd, n_years):
+
+    # Sum of (1 + rn - rd)**(-k) for k = 0 .. n_years - 1.
+    # expm1/log1p keep the result accurate when rn and rd are close; for rn == rd the sum is n_years.
+    log_growth = np.log1p(rn - rd)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        ratio = np.expm1(-n_years * log_growth) / np.expm1(-log_growth)
+    return np.where(log_growth == 0, n_years, ratio)
+
+
+def stock_kernel(year_GHG_neutrality, rn, rr, rd, Ae_initial=Ae_initial, Ae_2025=None, lifecycle=lifecycle):
+
+    # Average operational and embodied emissions in kg CO2e per year and per m² for a budget of 1 kg CO2e.
+    # The kernel only depends on the stock configuration (neutrality year, rn, rr, rd); the budget parameters
+    # scale the result linearly through share_operational and share_embodied.
+
+    # Because the yearly emissions follow the geometric stock development, the sums over the period
+    # 2025 to 'year_GHG_neutrality' are geometric series and no loop over the years is needed:
+    #   sum E_op  = share_operational / n / Ae_2025 * sum_k growth**(-(k + 1))
+    #   sum E_emb = share_embodied / n / ((rn + rr) * Ae_2025) / lifecycle * sum_k growth**(-k)
+    # Ae_2025 can be passed if the pre-correction is already known (e.g. from a table over the rate axes).
+
+    # The pre-correction is looked up before broadcasting, so it only sees the distinct rates
+    if Ae_2025 is None:
+        Ae_2025 = pre_correction(rn, rd, Ae_initial)
+
+    year_GHG_neutrality, rn, rr, rd = np.broadcast_arrays(
+        *(np.asarray(x, dtype=float) for x in (year_GHG_neutrality, rn, rr, rd))
+    )
+
+    n_years = year_GHG_neutrality + 1 - base_year
+    series = _geometric_sum(rn, rd, n_years)
+
+    kernel_op = series / n_years**2 / (Ae_2025 * (1 + rn - rd))
+    kernel_emb = series / n_years**2 / ((rn + rr) * Ae_2025) / lifecycle
+
+    return kernel_op, kernel_emb
+
+
+def calculate_emissions_batch(GB, Fn, year_GHG_neutrality, rn, rr, rd, Fb=Fb, Fe=Fe, Ae_initial=Ae_initial,
+                              Ae_2025=None, lifecycle=lifecycle, budget_deduction=budget_deduction, co2_share=co2_share):
+
+    # Vectorized version of calculate_emissions() in parallel coordinates.py.
+    # All parameters may be NumPy arrays (or broadcastable grids); the result has the broadcast shape.
+    # This includes the model constants (Fb, Fe, Ae_initial, lifecycle, budget_deduction, co2_share).
+    # Returns the average operational and embodied emissions in kg CO2e per year and per m².
+
+    share_operational, share_embodied = budget_shares(
+        np.asarray(GB, dtype=float), np.asarray(Fn, dtype=float), Fb, Fe, budget_deduction, co2_share
+    )
+    kernel_op, kernel_emb = stock_kernel(year_GHG_neutrality, rn, rr, rd, Ae_initial, Ae_2025, lifecycle)
+
+    return share_operational * kernel_op, share_embodied * kernel_emb
+
+
+def calculate_emissions_pathways(GB, Fn, year_GHG_neutrality, rn, rr, rd, Fb=Fb, Fe=Fe, Ae_initial=Ae_initial,
+                                 lifecycle=lifecycle, budget_deduction=budget_deduction, co2_share=co2_share):
+
+    # Average operational and embodied emissions in kg CO2e per year and per m² for time-varying rates.
+    # rn, rr and rd are scalars or pathways with one rate per year from 2025 to 'year_GHG_neutrality' on the
+    # last axis (e.g. rate_trajectory() for thousands of pathways); the budget parameters and constants may be
+    # arrays that broadcast against the pathway axes. The result has the shape of the pathway axes.
+
+    n_years = year_GHG_neutrality + 1 - base_year
+    share_operational, share_embodied = budget_shares(
+        np.asarray(GB, dtype=float), np.asarray(Fn, dtype=float), Fb, Fe, budget_deduction, co2_share
+    )
+
+    Ae_2025 = pre_correction(initial_rate(rn), initial_rate(rd), Ae_initial)
+    Ae, A_new = _stock_trajectory_varying(Ae_2025, rn, rr, rd, n_years)
+
+    average_op_em = share_operational / n_years**2 * np.sum(1 / Ae, axis=-1)
+    average_emb_em = share_embodied / n_years**2 / lifecycle * np.sum(1 / A_new, axis=-1)
+
+    return average_op_em, average_emb_em
+
+
+def calculate_emissions_factorized(GB, Fn, year_GHG_neutrality, rn, rr, rd, Fb=Fb, Fe=Fe, Ae_initial=Ae_initial):
+
+    # Factorized sweep: GB and Fn describe the budget points, (year_GHG_neutrality, rn, rr, rd) the stock points.
+    # The stock kernel is calculated once per stock point and combined with the budget scaling by an outer
+    # product, so the result has the shape (budget points, stock points), e.g. 45 x 1680 for the full sweep.
+
+    share_operational, share_embodied = budget_shares(
+        np.ravel(np.asarray(GB, dtype=float)), np.ravel(np.asarray(Fn, dtype=float)), Fb, Fe
+    )
+    kernel_op, kernel_emb = stock_kernel(
+        *(np.ravel(x) for x in np.broadcast_arrays(year_GHG_neutrality, rn, rr, rd)), Ae_initial
+    )
+
+    return np.multiply.outer(share_operational, kernel_op), np.multiply.outer(share_embodied, kernel_emb)
+
+
+def emissions_matrix(GB, Fn, year_GHG_neutrality, rn, rr, rd, Fb=Fb, Fe=Fe, Ae_initial=Ae_initial):
+
+    # Calculates the yearly trajectories of many scenarios as one (scenario x year) matrix.
+    # The scenarios have different horizons (2025 to 'year_GHG_neutrality'), so all rows are padded to the
+    # longest horizon and 'valid' marks the years that belong to each scenario. Padded entries are NaN.
+    # The parameters are broadcast against each other and flattened to one scenario axis.
+
+    # Returns:
+    #   - years: Years of the padded horizon (1D)
+    #   - valid: Validity mask (scenario x year)
+    #   - Ae, A_new, E_op, E_emb: Trajectories as in emissions_year_by_year() (scenario x year)
+
+    GB, Fn, year_GHG_neutrality, rn, rr, rd = (
+        x.ravel() for x in np.broadcast_arrays(
+            *(np.asarray(x, dtype=float) for x in (GB, Fn, year_GHG_neutrality, rn, rr, rd))
+        )
+    )
+
+    share_operational, share_embodied = budget_shares(GB, Fn, Fb, Fe)
+    n_years = year_GHG_neutrality + 1 - base_year
+
+    years = np.arange(base_year, int(year_GHG_neutrality.max()) + 1)
+    valid = years <= year_GHG_neutrality[:, None]
+
+    Ae_2025 = pre_correction(rn, rd, Ae_initial)
+    Ae, A_new = stock_trajectory(Ae_2025[:, None], rn[:, None], rr[:, None], rd[:, None], len(years))
+
+    E_op = share_operational[:, None] / n_years[:, None] / Ae
+    E_emb = share_embodied[:, None] / n_years[:, None] / A_new / lifecycle
+
+    Ae, A_new, E_op, E_emb = (np.where(valid, x, np.nan) for x in (Ae, A_new, E_op, E_emb))
+
+    return years, valid, Ae, A_new, E_op, E_emb
+
+
+def masked_sum(values, valid):
+
+    # Sum over the years of each scenario, ignoring the padded years
+    return np.sum(values, axis=-1, where=valid)
+
+
+def masked_average(values, valid):
+
+    # Average over the years of each scenario, ignoring the padded years
+    return masked_sum(values, valid) / np.count_nonzero(valid, axis=-1)
@@ -0,0 +1,86 @@
+import hashlib
+from collections import namedtuple
+from decimal import Decimal
+
+import numpy as np
+
+# Exact specification of the sweep axes. Every axis holds its values as exact decimals (or string labels), so
+# the grid never carries floating-point noise like np.arange(0.005, 0.0151, 0.002) does. Axes and grids
+# (tuples of axes) are immutable and hashable, and grid_digest() gives a key that is stable across processes.
+
+GridAxis = namedtuple('GridAxis', ['name', 'values'])
+
+
+def _exact(value):
+
+    # Exact decimal of a number as it is written (0.005 -> Decimal('0.005'), not the binary float value)
+    return value if isinstance(value, Decimal) else Decimal(str(value))
+
+
+def range_axis(name, start, stop, step):
+
+    # Axis from start to stop (inclusive) in integer steps, e.g. range_axis('rn', '0.005', '0.015', '0.002').
+    # The values are start + i * step with i = 0, 1, ..., calculated exactly in decimal arithmetic.
+
+    start, stop, step = _exact(start), _exact(stop), _exact(step)
+    if step <= 0:
+        raise ValueError(f"Step of axis '{name}' must be positive")
+
+    n_steps = (stop - start) / step
+    if n_steps < 0 or n_steps != n_steps.to_integral_value():
+        raise ValueError(f"Range of axis '{name}' is not a whole number of steps: {start} .. {stop} by {step}")
+
+    return GridAxis(name, tuple(start + i * step for i in range(int(n_steps) + 1)))
+
+
+def values_axis(name, values):
+
+    # Axis from a list of values; numbers are stored as exact decimals and strings as labels
+    return GridAxis(name, tuple(value if isinstance(value, str) else _exact(value) for value in values))
+
+
+def axis_values(axis):
+
+    # Evaluation array of an axis: int64 if all values are whole numbers, float64 for other numbers
+    # (nearest double of each exact decimal) and str for labels
+    if all(isinstance(value, str) for value in axis.values):
+        return np.array(axis.values)
+    if all(value == value.to_integral_value() for value in axis.values):
+        return np.array([int(value) for value in axis.values], dtype=np.int64)
+    return np.array([float(value) for value in axis.values])
+
+
+def axis_ticks(axis, scale=1):
+
+    # Tick values of an axis, scaled exactly before the conversion to float (e.g. scale=100 for percent)
+    return [float(value * _exact(scale)) for value in axis.values]
+
+
+def axis_position(axis, value):
+
+    # Integer position of a value on the axis (numbers are compared as exact decimals)
+    return axis.values.index(value if isinstance(value, str) else _exact(value))
+
+
+def grid_digest(*parts):
+
+    # Stable hex key of grid specifications and other parameters (e.g. model constants). The canonical text of
+    # the parts is hashed with SHA-256, so the key is the same in every process and Python version.
+    text = repr(tuple(_canonical(part) for part in parts))
+    return hashlib.sha256(text.encode('utf-8')).hexdigest()
+
+
+def _canonical(part):
+
+    # Canonical, order-preserving representation for grid_digest()
+    if isinstance(part, GridAxis):
+        return ('axis', part.name, tuple(_canonical(value) for value in part.values))
+    if isinstance(part, dict):
+        return ('dict', tuple((_canonical(key), _canonical(value)) for key, value in part.items()))
+    if isinstance(part, (tuple, list)):
+        return tuple(_canonical(value) for value in part)
+    if isinstance(part, str):
+        return part
+    if isinstance(part, (int, float, Decimal, np.integer, np.floating)):
+        return str(_exact(part).normalize())
+    raise TypeError(f"Cannot build a grid key from {type(part).__name__}")
@@ -0,0 +1,68 @@
+import numpy as np
+
+from emission_engine import pre_correction
+from sampling import default_parameters, evaluate_samples
+
+# Inverse mode of the static budget model: which new-build, renovation or demolition rate keeps the budget per m²
+# at a target value? For every combination of the other parameters, the boundary rate is found by a bisection
+# that runs on all combinations at once (one batched model evaluation per iteration).
+
+solvable_rates = ('rn', 'rr', 'rd')
+
+model_outputs = ('average_op_em', 'average_emb_em')
+
+
+def solve_rate(target, rate='rr', output='average_emb_em', bracket=(0.0, 0.05), xtol=1e-12, max_iter=100, **parameters):
+
+    # Rate at which the output (average operational or embodied emissions in kg CO2e/(m²·a)) equals the target.
+    #   - target:     Budget per m² (may be an array)
+    #   - rate:       Rate that is solved for ('rn', 'rr' or 'rd')
+    #   - bracket:    Search interval of the rate
+    #   - parameters: Other model parameters (see sampling.default_parameters); arrays are broadcast, e.g. a grid
+    #                 of budget settings
+    # The outputs are monotonic in each rate, so the boundary is unique within the bracket.
+    # Returns:
+    #   - boundary:       Boundary rate (NaN where the target is not reached within the bracket)
+    #   - feasible_below: True where rates below the boundary keep the output at or above the target
+
+    if rate not in solvable_rates:
+        raise ValueError(f"Unknown rate '{rate}', expected one of {solvable_rates}")
+    if rate in parameters:
+        raise ValueError(f"'{rate}' is solved for and cannot be given as a parameter")
+    if output not in model_outputs:
+        raise ValueError(f"Unknown output '{output}', expected one of {model_outputs}")
+
+    position = model_outputs.index(output)
+    shape = np.broadcast_shapes(np.shape(target), *(np.shape(value) for value in parameters.values()))
+
+    def excess(x):
+        # Output minus target; the output is feasible where this is >= 0.
+        # Every midpoint of rn or rd is a new pair of rates, so its pre-correction bypasses the shared cache.
+        samples = {**parameters, rate: x}
+        Ae_2025 = None
+        if rate in ('rn', 'rd'):
+            values = {**default_parameters, **samples}
+            Ae_2025 = pre_correction(values['rn'], values['rd'], values['Ae_initial'], use_cache=False)
+        return evaluate_samples(samples, Ae_2025)[position] - target
+
+    low = np.full(shape, float(bracket[0]))
+    high = np.full(shape, float(bracket[1]))
+    f_low = np.broadcast_to(excess(low), shape)
+    f_high = np.broadcast_to(excess(high), shape)
+
+    feasible_below = f_low >= 0
+    valid = (f_low >= 0) != (f_high >= 0)
+
+    for _ in range(max_iter):
+        if np.all(high - low <= xtol):
+            break
+        mid = 0.5 * (low + high)
+        f_mid = excess(mid)
+        # Keep the half of the interval in which the output crosses the target
+        same_side = (f_mid >= 0) == (f_low >= 0)
+        low = np.where(same_side, mid, low)
+        f_low = np.where(same_side, f_mid, f_low)
+        high = np.where(same_side, high, mid)
+
+    boundary = np.where(valid, 0.5 * (low + high), np.nan)
+    return boundary[()], feasible_below[()]
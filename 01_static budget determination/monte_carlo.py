@@ -0,0 +1,71 @@
+import numpy as np
+
+import emission_engine
+from sampling import evaluate_samples
+
+# Monte Carlo propagation of the uncertainty of the model constants to the static budget of
+# calculations_year_by_year.py. The constants are drawn from given distributions in chunked NumPy batches and
+# evaluated with the vectorized model; the result are percentiles of the operational and embodied budget per m².
+
+# Constants that can be treated as uncertain. The area factors enter through the net room area Ae_initial.
+uncertain_parameters = ('Fb', 'Fe', 'co2_share', 'budget_deduction', 'gross_floor_factor', 'net_room_factor')
+
+
+def _net_room_area(gross_floor_factor, net_room_factor):
+
+    # Net room area of the building stock in m² for (sampled) area factors
+    Ae_residential = (
+        (emission_engine.living_area - emission_engine.living_area_nonresidential) * gross_floor_factor * net_room_factor
+    )
+    return Ae_residential + emission_engine.Ae_nonresidential
+
+
+def monte_carlo_chunks(distributions, n_samples, seed=None, chunk_size=2**20, **fixed):
+
+    # Draws n_samples sets of constants and yields the results in chunks.
+    #   - distributions: dict {constant: frozen scipy.stats distribution}, e.g. {'Fb': stats.norm(0.303, 0.02)}
+    #   - fixed:         other model parameters (see sampling.default_parameters), e.g. rn=0.01
+    # Every chunk is a dict with the drawn constants and 'average_op_em' / 'average_emb_em'.
+
+    unknown = set(distributions) - set(uncertain_parameters)
+    if unknown:
+        raise KeyError(f"Unknown uncertain constants: {sorted(unknown)}")
+
+    rng = np.random.default_rng(seed)
+    for start in range(0, n_samples, chunk_size):
+        size = min(chunk_size, n_samples - start)
+        chunk = {name: np.asarray(distribution.rvs(size=size, random_state=rng)) for name, distribution in distributions.items()}
+
+        parameters = dict(fixed)
+        for name in ('Fb', 'Fe', 'co2_share', 'budget_deduction'):
+            if name in chunk:
+                parameters[name] = chunk[name]
+        if 'gross_floor_factor' in chunk or 'net_room_factor' in chunk:
+            parameters['Ae_initial'] = _net_room_area(
+                chunk.get('gross_floor_factor', emission_engine.gross_floor_factor),
+                chunk.get('net_room_factor', emission_engine.net_room_factor),
+            )
+
+        chunk['average_op_em'], chunk['average_emb_em'] = evaluate_samples(parameters)
+        yield chunk
+
+
+def monte_carlo_percentiles(distributions, n_samples, percentiles=(2.5, 50, 97.5), seed=None, chunk_size=2**20, **fixed):
+
+    # Percentiles of the average operational and embodied emissions in kg CO2e/(m²·a) over n_samples draws.
+    # Only the two result columns are kept from every chunk, the drawn constants are discarded.
+    # Returns a dict with 'percentiles' and, for 'average_op_em' and 'average_emb_em', the percentile values,
+    # the mean ('..._mean') and the standard deviation ('..._std').
+
+    results = {'average_op_em': [], 'average_emb_em': []}
+    for chunk in monte_carlo_chunks(distributions, n_samples, seed, chunk_size, **fixed):
+        for name in results:
+            results[name].append(chunk[name])
+
+    summary = {'percentiles': np.asarray(percentiles)}
+    for name, chunks in results.items():
+        values = np.concatenate(chunks)
+        summary[name] = np.percentile(values, percentiles)
+        summary[name + '_mean'] = values.mean()
+        summary[name + '_std'] = values.std()
+    return summary
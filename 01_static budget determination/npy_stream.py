@@ -0,0 +1,32 @@
+import numpy as np
+
+# Streaming output to .npy files. The header of a file is written for the full array before any data, and the
+# data is appended chunk by chunk in C order, so arrays larger than the memory can be written and opened again
+# with np.load(path, mmap_mode='r'). Used by sweep.write_sweep() and dynamic_pipeline.write_dynamic().
+
+
+def open_npy(path, shape, dtype):
+
+    # Opens a .npy file for an array of the given shape and dtype and writes its header.
+    # Returns the open file; the data is appended with file.write(np.ascontiguousarray(chunk).tobytes()).
+    file = open(path, 'wb')
+    header = {'descr': np.lib.format.dtype_to_descr(np.dtype(dtype)), 'fortran_order': False, 'shape': tuple(shape)}
+    np.lib.format.write_array_header_1_0(file, header)
+    return file
+
+
+def write_npy_chunks(paths, chunks, n_rows):
+
+    # Streams chunks (dicts of arrays that are split along their first axis) to one .npy file per entry of
+    # paths {name: path}. The files are opened when the first chunk arrives, with its dtype and its shape
+    # beyond the first axis; all chunks together have n_rows rows. Only one chunk is held in memory.
+    files = {}
+    try:
+        for chunk in chunks:
+            for name, path in paths.items():
+                if name not in files:
+                    files[name] = open_npy(path, (n_rows,) + np.shape(chunk[name])[1:], chunk[name].dtype)
+                files[name].write(np.ascontiguousarray(chunk[name]).tobytes())
+    finally:
+        for file in files.values():
+            file.close()
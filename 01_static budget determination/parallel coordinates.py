@@ -1,7 +1,10 @@
-import numpy as np
-import pandas as pd
 import plotly.express as px
 
+from emission_engine import pre_correction
+from grid_spec import axis_ticks, range_axis
+from result_cube import cube_select, cube_to_dataframe
+from sweep_cache import cached_sweep_cube
+
 # Define the parameters for the Global Budget based on temperature and probability of reaching this temperature 
 # (IPCC. Summary for Policymakers: Climate Change 2021: The Physical Science Basis. Contribution
 # of Working Group I to the Sixth Assessment Report of the Intergovernmental Panel on Climate Change)
@@ -53,18 +56,9 @@ def calculate_emissions(GB, Fn, year_GHG_neutrality, rn, rr, rd):
     #   - Operational emissions
     #   - Embodied emissions
 
-    # 1) Pre-correction for the period 2021–2025
-    years_pre = 2025 - 2021  # Number of years before 2025 we want to account for
-    Ae_temp = Ae_initial
-
-    for _ in range(years_pre):
-        # Estimate new construction and demolition in each of those pre-years
-        pre_An = rn * Ae_temp  # New construction
-        pre_Ad = rd * Ae_temp  # Demolition
-        Ae_temp += pre_An - pre_Ad
-
-    # Building area in 2025 (after pre-correction)
-    Ae_2025 = Ae_temp
+    # 1) Pre-correction for the period 2021–2025 (memoized for each (rn, rd) pair, see emission_engine.py)
+    # Building area in 2025 (after pre-correction):
+    Ae_2025 = pre_correction(rn, rd, Ae_initial)
     
     # 2) Initialize lists to store yearly results
     years = list(range(2025, year_GHG_neutrality + 1))  # from 2025 to 'year_GHG_neutrality'
@@ -116,26 +110,31 @@ def calculate_emissions(GB, Fn, year_GHG_neutrality, rn, rr, rd):
     return average_op_em, average_emb_em
 
 # Prepare the data for all combinations of parameters
-rows = []
-for (temp_goal, prob), GB in global_budget.items():
-    for fn_label, Fn in Fn_values.items():
-        for year_GHG_neutrality in range(2035, 2051, 5):  # Year of climate neutrality from 2035 to 2050
-            for rn in np.arange(0.005, 0.0151, 0.002):  # New build rate ranging from 0.5 % to 1.5 %
-                for rr in np.arange(0.005, 0.0201, 0.0025):  # Renovation rate ranging from 0.5 % to 2 %
-                    for rd in np.arange(0.0005, 0.0051, 0.0005):  # Demolition rate ranging from 0.05 % to 0.5 %
-                        op_emissions, emb_emissions = calculate_emissions(GB, Fn, year_GHG_neutrality, rn, rr, rd)
-                        rows.append([
-                            temp_goal, prob, fn_label, Fn * 100, year_GHG_neutrality, rn * 100, rr * 100, rd * 100, op_emissions, emb_emissions
-                        ])
+# Sweep axes defined by exact decimal values and integer steps (see grid_spec.py)
+stock_grid = (
+    range_axis('year_GHG_neutrality', 2035, 2050, 5),   # Year of climate neutrality from 2035 to 2050
+    range_axis('rn', '0.005', '0.015', '0.002'),        # New build rate ranging from 0.5 % to 1.5 %
+    range_axis('rr', '0.005', '0.02', '0.0025'),        # Renovation rate ranging from 0.5 % to 2 %
+    range_axis('rd', '0.0005', '0.005', '0.0005'),      # Demolition rate ranging from 0.05 % to 0.5 %
+)
+
+# Calculate the results as a cube with one axis per parameter (see result_cube.py).
+# Results of identical inputs are loaded from the on-disk cache (see sweep_cache.py).
+cube = cached_sweep_cube(global_budget, Fn_values, stock_grid, Fb=Fb, Fe=Fe, Ae_initial=Ae_initial)
+
+# Spot check of the cube against the year-by-year loop of calculate_emissions() for the static budget of
+# calculations_year_by_year.py (1.7 °C, 83 %, equal per capita, climate neutrality 2045, rn 0.9 %, rr 1 %, rd 0.1 %)
+spot_check = cube_select(
+    cube, temperature=1.7, probability=83, allocation='Equal per capita', year_GHG_neutrality=2045,
+    rn=0.009, rr=0.01, rd=0.001
+)
+reference = calculate_emissions(global_budget[(1.7, 83)], Fn_values['Equal per capita'], 2045, 0.009, 0.01, 0.001)
+for name, value in zip(('average_op_em', 'average_emb_em'), reference):
+    if abs(spot_check[name] / value - 1) > 1e-9:
+        raise RuntimeError(f"Sweep result {name} = {spot_check[name]} differs from the year-by-year loop ({value})")
 
 # Create a DataFrame with the results
-df = pd.DataFrame(rows, columns=[
-    'Temp. Goal (°C)', 'Probability (%)', 'National Budget Allocation Label',
-    'National Budget Allocation Value (%)', 'Year of Climate Neutrality',
-    'New Build Rate', 'Renovation Rate', 'Demolition Rate',
-    'Operational Emissions (kg CO2e/(m²·a))',
-    'Embodied Emissions (kg CO2e/(m²·a))'
-])
+df = cube_to_dataframe(cube)
 
 # Setting the color code
 alpha = Fo  # Share for color coding
@@ -143,9 +142,9 @@ df['-'] = (alpha * df['Operational Emissions (kg CO2e/(m²·a))'] +
                          (1 - alpha) * df['Embodied Emissions (kg CO2e/(m²·a))'])
 
 # Prepare tick values for percentage axes
-tick_values_rn = [rn * 100 for rn in np.arange(0.005, 0.0151, 0.002)]
-tick_values_rr = [rr * 100 for rr in np.arange(0.005, 0.0201, 0.0025)]
-tick_values_rd = [rd * 100 for rd in np.arange(0.0005, 0.0051, 0.0005)]
+tick_values_rn = axis_ticks(stock_grid[1], 100)
+tick_values_rr = axis_ticks(stock_grid[2], 100)
+tick_values_rd = axis_ticks(stock_grid[3], 100)
 
 # Plot the Parallel Coordinates Chart
 fig = px.parallel_coordinates(
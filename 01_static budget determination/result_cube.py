@@ -0,0 +1,199 @@
+import numpy as np
+import pandas as pd
+
+from emission_engine import Ae_initial, Fb, Fe, calculate_emissions_factorized
+
+# Result cube of the parameter sweep: one ndarray axis per sweep dimension plus coordinate vectors, instead of
+# a long table that repeats all parameter columns for every result. The cube is a dict with the keys
+#   - 'dims':           Names of the axes (see cube_dims)
+#   - 'coords':         Coordinate vector of each axis
+#   - 'Fn':             Allocation factor of each entry on the 'allocation' axis
+#   - 'average_op_em':  Average operational emissions in kg CO2e/(m²·a)
+#   - 'average_emb_em': Average embodied emissions in kg CO2e/(m²·a)
+# Budget combinations that are missing in the global budget table are NaN.
+
+cube_dims = ('temperature', 'probability', 'allocation', 'year_GHG_neutrality', 'rn', 'rr', 'rd')
+
+cube_values = ('average_op_em', 'average_emb_em')
+
+# Columns of the long DataFrame of parallel coordinates.py
+dataframe_columns = {
+    'temperature': 'Temp. Goal (°C)',
+    'probability': 'Probability (%)',
+    'allocation': 'National Budget Allocation Label',
+    'Fn': 'National Budget Allocation Value (%)',
+    'year_GHG_neutrality': 'Year of Climate Neutrality',
+    'rn': 'New Build Rate',
+    'rr': 'Renovation Rate',
+    'rd': 'Demolition Rate',
+    'average_op_em': 'Operational Emissions (kg CO2e/(m²·a))',
+    'average_emb_em': 'Embodied Emissions (kg CO2e/(m²·a))',
+}
+
+# Coordinates that are shown in percent in the DataFrame
+percent_coords = ('Fn', 'rn', 'rr', 'rd')
+
+
+def budget_table(global_budget):
+
+    # Temperatures, probabilities and the global budget table (temperature x probability) of the budget dict.
+    # Combinations that are missing in the dict are NaN.
+    temperatures = np.array(sorted({temp_goal for temp_goal, _ in global_budget}))
+    probabilities = np.array(sorted({prob for _, prob in global_budget}))
+    GB = np.array([[global_budget.get((temp_goal, prob), np.nan) for prob in probabilities] for temp_goal in temperatures])
+    return temperatures, probabilities, GB
+
+
+def evaluate_block(GB, Fn, neutrality_years, rn_values, rr_values, rd_values, Fb=Fb, Fe=Fe, Ae_initial=Ae_initial):
+
+    # Evaluates a (sub-)grid of the cube: GB is the budget table (temperature x probability), Fn the allocation
+    # factors and the remaining parameters are the stock axes. Returns the average operational and embodied
+    # emissions with one axis per cube dimension.
+
+    shape = GB.shape + (len(Fn), len(neutrality_years), len(rn_values), len(rr_values), len(rd_values))
+
+    # Budget points (temperature x probability x allocation) times stock points (year x rn x rr x rd)
+    GB_points, Fn_points = np.broadcast_arrays(GB[:, :, None], np.asarray(Fn)[None, None, :])
+    stock_points = np.meshgrid(neutrality_years, rn_values, rr_values, rd_values, indexing='ij')
+    average_op_em, average_emb_em = calculate_emissions_factorized(
+        GB_points, Fn_points, *stock_points, Fb=Fb, Fe=Fe, Ae_initial=Ae_initial
+    )
+
+    return average_op_em.reshape(shape), average_emb_em.reshape(shape)
+
+
+def sweep_cube(global_budget, Fn_values, neutrality_years, rn_values, rr_values, rd_values,
+               Fb=Fb, Fe=Fe, Ae_initial=Ae_initial):
+
+    # Evaluates the full sweep into a result cube.
+    #   - global_budget: dict {(temperature, probability): global CO2 budget in Gt}
+    #   - Fn_values:     dict {allocation label: allocation factor}
+    #   - neutrality_years, rn_values, rr_values, rd_values: 1D axes of the stock parameters
+
+    temperatures, probabilities, GB = budget_table(global_budget)
+    Fn = np.array(list(Fn_values.values()))
+
+    coords = {
+        'temperature': temperatures,
+        'probability': probabilities,
+        'allocation': np.array(list(Fn_values.keys())),
+        'year_GHG_neutrality': np.asarray(neutrality_years),
+        'rn': np.asarray(rn_values),
+        'rr': np.asarray(rr_values),
+        'rd': np.asarray(rd_values),
+    }
+
+    average_op_em, average_emb_em = evaluate_block(
+        GB, Fn, *(coords[dim] for dim in cube_dims[3:]), Fb=Fb, Fe=Fe, Ae_initial=Ae_initial
+    )
+
+    return {
+        'dims': cube_dims,
+        'coords': coords,
+        'Fn': Fn,
+        'average_op_em': average_op_em,
+        'average_emb_em': average_emb_em,
+    }
+
+
+def _coord_positions(coord, values):
+
+    # Positions of the given values on a coordinate axis (floating-point coordinates are matched with np.isclose)
+    positions = []
+    for value in np.atleast_1d(values):
+        if coord.dtype.kind == 'f':
+            matches = np.flatnonzero(np.isclose(coord, value, rtol=1e-9, atol=0))
+        else:
+            matches = np.flatnonzero(coord == value)
+        if len(matches) == 0:
+            raise KeyError(f"{value!r} is not a coordinate of the axis")
+        positions.append(matches[0])
+    return np.array(positions)
+
+
+def cube_select(cube, **selection):
+
+    # Selects a part of the cube by coordinate values, e.g. cube_select(cube, temperature=1.5, rn=[0.005, 0.007]).
+    # A scalar value removes the axis, a list of values keeps it (lists select sub-grids, not point-wise pairs).
+
+    result = {'dims': (), 'coords': {}, 'Fn': cube['Fn']}
+    values = {name: cube[name] for name in cube_values}
+
+    axis = 0
+    for dim in cube['dims']:
+        if dim in selection:
+            positions = _coord_positions(cube['coords'][dim], selection[dim])
+            if np.ndim(selection[dim]) == 0:
+                positions = positions[0]
+            if dim == 'allocation':
+                result['Fn'] = cube['Fn'][positions]
+            values = {name: np.take(value, positions, axis=axis) for name, value in values.items()}
+            if np.ndim(positions) == 0:
+                continue
+            result['coords'][dim] = cube['coords'][dim][positions]
+        else:
+            result['coords'][dim] = cube['coords'][dim]
+        result['dims'] += (dim,)
+        axis += 1
+
+    result.update(values)
+    return result
+
+
+def cube_mean(cube, dims):
+
+    # Marginal mean of the results over the given axes (missing budget combinations are ignored)
+
+    dims = (dims,) if isinstance(dims, str) else tuple(dims)
+    axes = tuple(cube['dims'].index(dim) for dim in dims)
+
+    result = {
+        'dims': tuple(dim for dim in cube['dims'] if dim not in dims),
+        'coords': {dim: coord for dim, coord in cube['coords'].items() if dim not in dims},
+        'Fn': cube['Fn'],
+    }
+    for name in cube_values:
+        result[name] = np.nanmean(cube[name], axis=axes)
+
+    return result
+
+
+def _narrow_integers(coord):
+
+    # Smallest signed integer dtype that holds all values of an integer coordinate (e.g. int8 for probabilities).
+    # Signed types are used so that differences (e.g. year - 2025) do not wrap around.
+    if coord.dtype.kind not in 'iu' or len(coord) == 0:
+        return coord
+    for dtype in (np.int8, np.int16, np.int32):
+        if np.iinfo(dtype).min <= coord.min() and coord.max() <= np.iinfo(dtype).max:
+            return coord.astype(dtype)
+    return coord.astype(np.int64)
+
+
+def cube_to_dataframe(cube, dropna=True, float32=False):
+
+    # Converts the cube to the long DataFrame of parallel coordinates.py (one row per grid point, rows in the
+    # order of the nested loops). Missing budget combinations are dropped unless dropna is False.
+    # The allocation labels are stored as a categorical column and integer coordinates (probability, year of
+    # climate neutrality) with the narrowest integer dtype. With float32=True the emission columns are float32.
+
+    shape = cube[cube_values[0]].shape
+    positions = np.indices(shape).reshape(len(shape), -1)
+
+    columns = {}
+    for dim, position in zip(cube['dims'], positions):
+        coord = cube['coords'][dim]
+        if dim == 'allocation':
+            columns[dataframe_columns[dim]] = pd.Categorical.from_codes(position, categories=coord)
+            columns[dataframe_columns['Fn']] = cube['Fn'][position] * 100
+        elif dim in percent_coords:
+            columns[dataframe_columns[dim]] = coord[position] * 100
+        else:
+            columns[dataframe_columns[dim]] = _narrow_integers(coord)[position]
+    for name in cube_values:
+        columns[dataframe_columns[name]] = cube[name].ravel().astype(np.float32 if float32 else np.float64)
+
+    df = pd.DataFrame(columns)
+    if dropna:
+        df = df.dropna(subset=[dataframe_columns[name] for name in cube_values]).reset_index(drop=True)
+    return df
@@ -0,0 +1,103 @@
+import numpy as np
+from scipy.stats import qmc
+
+import emission_engine
+from emission_engine import calculate_emissions_batch
+
+# Quasi-random sampling of the static budget model. Instead of a full factorial over all parameters, a fixed
+# number of low-discrepancy points (Sobol sequence or Latin hypercube) is drawn over continuous parameter ranges
+# and evaluated with the vectorized model, so many dimensions can be explored with a fixed compute budget.
+
+# Model parameters that can be sampled, with the values used when a parameter is not sampled
+# (static budget of calculations_year_by_year.py)
+default_parameters = {
+    'GB': 550,                      # Global CO2 budget in Gt (1.7 °C, 83 %)
+    'Fn': 0.0106,                   # Allocation factor (Equal per capita)
+    'year_GHG_neutrality': 2045,
+    'rn': 0.009,
+    'rr': 0.01,
+    'rd': 0.001,
+    'Fb': emission_engine.Fb,
+    'Fe': emission_engine.Fe,
+    'Ae_initial': emission_engine.Ae_initial,
+    'lifecycle': emission_engine.lifecycle,
+    'budget_deduction': emission_engine.budget_deduction,
+    'co2_share': emission_engine.co2_share,
+}
+
+# Parameters that only take whole numbers (sampled uniformly from low to high, both included)
+integer_parameters = ('year_GHG_neutrality',)
+
+sampling_methods = ('sobol', 'lhs')
+
+
+def _sampler(n_dims, method, seed):
+
+    # Low-discrepancy sampler on the unit hypercube
+    if method == 'sobol':
+        return qmc.Sobol(n_dims, scramble=True, seed=seed)
+    if method == 'lhs':
+        return qmc.LatinHypercube(n_dims, seed=seed)
+    raise ValueError(f"Unknown sampling method '{method}', expected one of {sampling_methods}")
+
+
+def scale_samples(unit, ranges):
+
+    # Scales points of the unit hypercube (n x len(ranges)) to the parameter ranges {name: (low, high)}.
+    # A list of values instead of a range is sampled as a discrete choice with equal probabilities
+    # (e.g. the entries of the global budget table).
+    samples = {}
+    for column, (name, bounds) in zip(unit.T, ranges.items()):
+        if isinstance(bounds, (list, np.ndarray)):
+            values = np.asarray(bounds)
+            samples[name] = values[np.minimum((column * len(values)).astype(np.int64), len(values) - 1)]
+            continue
+        low, high = bounds
+        if name in integer_parameters:
+            samples[name] = np.minimum(np.floor(low + column * (high + 1 - low)), high).astype(np.int64)
+        else:
+            samples[name] = low + column * (high - low)
+    return samples
+
+
+def evaluate_samples(samples, Ae_2025=None):
+
+    # Evaluates the model for sampled parameters {name: array}; parameters that are not given take their
+    # default value. Returns the average operational and embodied emissions in kg CO2e/(m²·a).
+    # Ae_2025 can be passed if the pre-correction of the samples is already known (see stock_kernel()).
+    unknown = set(samples) - set(default_parameters)
+    if unknown:
+        raise KeyError(f"Unknown model parameters: {sorted(unknown)}")
+    parameters = {**default_parameters, **samples}
+    return calculate_emissions_batch(**parameters, Ae_2025=Ae_2025)
+
+
+def sample_chunks(ranges, n_samples, method='sobol', seed=None, chunk_size=2**20):
+
+    # Draws 'n_samples' points over the parameter ranges {name: (low, high) or list of values} and yields them
+    # in chunks, so that together they form the same design as one draw:
+    #   - Sobol: the chunks continue one low-discrepancy sequence. n_samples should be a power of 2 to keep its
+    #     balance properties.
+    #   - LHS: a Latin hypercube is only stratified as a whole, so the unit design of all n_samples points is
+    #     drawn at once (n_samples x dimensions) and only the scaling and evaluation run in chunks.
+    # Every chunk is a dict with the sampled parameters and 'average_op_em' / 'average_emb_em'.
+
+    unknown = set(ranges) - set(default_parameters)
+    if unknown:
+        raise KeyError(f"Unknown model parameters: {sorted(unknown)}")
+
+    sampler = _sampler(len(ranges), method, seed)
+    design = sampler.random(n_samples) if method == 'lhs' else None
+    for start in range(0, n_samples, chunk_size):
+        stop = min(start + chunk_size, n_samples)
+        unit = sampler.random(stop - start) if design is None else design[start:stop]
+        chunk = scale_samples(unit, ranges)
+        chunk['average_op_em'], chunk['average_emb_em'] = evaluate_samples(chunk)
+        yield chunk
+
+
+def sample_emissions(ranges, n_samples, method='sobol', seed=None, chunk_size=2**20):
+
+    # Same as sample_chunks(), with all chunks concatenated into one dict of arrays
+    chunks = list(sample_chunks(ranges, n_samples, method, seed, chunk_size))
+    return {name: np.concatenate([chunk[name] for chunk in chunks]) for name in chunks[0]} if chunks else {}
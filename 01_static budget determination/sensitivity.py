@@ -0,0 +1,116 @@
+import numpy as np
+from scipy.stats import qmc
+
+from sampling import default_parameters, evaluate_samples, scale_samples
+
+# Variance-based global sensitivity analysis of the static budget model. First-order and total Sobol indices
+# are estimated with a Saltelli sampling design: two independent sample matrices A and B and, for every input i,
+# the matrix AB_i (A with column i taken from B). The N * (d + 2) model evaluations are done with the vectorized
+# model in chunks. Confidence intervals come from bootstrap resampling of the N sample rows.
+
+sensitivity_outputs = ('average_op_em', 'average_emb_em')
+
+# Number of bootstrap replicates that are calculated together
+bootstrap_batch = 32
+
+
+def saltelli_design(ranges, n_base, seed=None):
+
+    # Unit-hypercube matrices A, B (n_base x d) and the stacked AB_i matrices (d x n_base x d).
+    # A and B are the two halves of one scrambled Sobol sequence in 2 * d dimensions; n_base should be a power of 2.
+    d = len(ranges)
+    unit = qmc.Sobol(2 * d, scramble=True, seed=seed).random(n_base)
+    A, B = unit[:, :d], unit[:, d:]
+
+    AB = np.repeat(A[None, :, :], d, axis=0)
+    for i in range(d):
+        AB[i, :, i] = B[:, i]
+    return A, B, AB
+
+
+def _evaluate_unit(unit, ranges, fixed, chunk_size):
+
+    # Model outputs for points of the unit hypercube, evaluated in chunks
+    outputs = {name: np.empty(len(unit)) for name in sensitivity_outputs}
+    for start in range(0, len(unit), chunk_size):
+        stop = min(start + chunk_size, len(unit))
+        samples = scale_samples(unit[start:stop], ranges)
+        outputs['average_op_em'][start:stop], outputs['average_emb_em'][start:stop] = evaluate_samples({**fixed, **samples})
+    return outputs
+
+
+def _row_terms(f_A, f_B, f_AB):
+
+    # Per-row terms whose means give the Sobol estimators (2 * d + 2 rows, one column per base sample):
+    #   - f_B * (f_AB_i - f_A)        -> first-order index (Saltelli 2010)
+    #   - (f_A - f_AB_i)**2 / 2       -> total index (Jansen 1999)
+    #   - mean and mean square of f_A and f_B -> variance
+    # The outputs are centered first, so the variance does not suffer from cancellation.
+    center = np.mean(np.concatenate([f_A, f_B]))
+    f_A, f_B, f_AB = f_A - center, f_B - center, f_AB - center
+    return np.vstack([
+        f_B * (f_AB - f_A),
+        0.5 * (f_A - f_AB) ** 2,
+        0.5 * (f_A + f_B),
+        0.5 * (f_A**2 + f_B**2),
+    ])
+
+
+def _indices_from_means(means, d):
+
+    # First-order and total indices from the means of the row terms (works for stacked bootstrap means)
+    variance = means[..., -1] - means[..., -2] ** 2
+    return means[..., :d] / variance[..., None], means[..., d:2 * d] / variance[..., None]
+
+
+def sobol_indices(ranges, n_base=2**14, seed=None, n_bootstrap=200, confidence=0.95, chunk_size=2**20, **fixed):
+
+    # First-order and total Sobol indices of the average operational and embodied emissions.
+    #   - ranges:  dict {parameter: (low, high) or list of values}, e.g. the inputs GB (list of the budget table
+    #              entries), Fn, year_GHG_neutrality, rn, rr, rd, Fb and Fe (see sampling.default_parameters)
+    #   - n_base:  Number of base samples N; the model is evaluated N * (d + 2) times
+    #   - fixed:   Values of the model parameters that are not varied
+    # Returns a dict with 'parameters' and, for each output, a dict with the estimates 'S1' and 'ST' and their
+    # bootstrap confidence intervals 'S1_conf' and 'ST_conf' (d x 2: lower and upper bound).
+
+    unknown = (set(ranges) | set(fixed)) - set(default_parameters)
+    if unknown:
+        raise KeyError(f"Unknown model parameters: {sorted(unknown)}")
+
+    d = len(ranges)
+    A, B, AB = saltelli_design(ranges, n_base, seed)
+    outputs = _evaluate_unit(np.concatenate([A, B, AB.reshape(-1, d)]), ranges, fixed, chunk_size)
+
+    terms = {}
+    for name in sensitivity_outputs:
+        f_A = outputs[name][:n_base]
+        f_B = outputs[name][n_base:2 * n_base]
+        f_AB = outputs[name][2 * n_base:].reshape(d, n_base)
+        terms[name] = _row_terms(f_A, f_B, f_AB)
+
+    # Bootstrap: every replicate resamples the base rows (the same rows for A, B and all AB_i). The replicate
+    # means are weighted means of the row terms with the resampling counts, calculated as one matrix product
+    # per batch of replicates.
+    rng = np.random.default_rng(seed)
+    boot_means = {name: np.empty((n_bootstrap, 2 * d + 2)) for name in sensitivity_outputs}
+    for start in range(0, n_bootstrap, bootstrap_batch):
+        stop = min(start + bootstrap_batch, n_bootstrap)
+        counts = np.stack([
+            np.bincount(rng.integers(0, n_base, size=n_base), minlength=n_base) for _ in range(start, stop)
+        ]).astype(float)
+        for name in sensitivity_outputs:
+            boot_means[name][start:stop] = counts @ terms[name].T / n_base
+
+    alpha = (1 - confidence) / 2
+    results = {'parameters': list(ranges)}
+    for name in sensitivity_outputs:
+        S1, ST = _indices_from_means(terms[name].mean(axis=1), d)
+        S1_boot, ST_boot = _indices_from_means(boot_means[name], d)
+        results[name] = {
+            'S1': S1,
+            'ST': ST,
+            'S1_conf': np.quantile(S1_boot, [alpha, 1 - alpha], axis=0).T,
+            'ST_conf': np.quantile(ST_boot, [alpha, 1 - alpha], axis=0).T,
+        }
+
+    return results
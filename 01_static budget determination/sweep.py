@@ -0,0 +1,153 @@
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+
+from emission_engine import Ae_initial, Fb, Fe, calculate_emissions_batch, pre_correction
+from npy_stream import write_npy_chunks
+
+# Streaming evaluation of the parameter sweep of parallel coordinates.py. The full factorial over the sweep
+# axes is processed in fixed-size chunks, so the memory use stays constant for any number of grid points.
+
+# Sweep parameters in the order of the nested loops (outermost first)
+sweep_parameters = ('GB', 'Fn', 'year_GHG_neutrality', 'rn', 'rr', 'rd')
+
+# Result columns of the sweep
+sweep_results = ('average_op_em', 'average_emb_em')
+
+
+def sweep_size(*axes):
+
+    # Number of grid points of the full factorial over the given axes
+    return int(np.prod([len(axis) for axis in axes], dtype=np.int64))
+
+
+def _evaluate_range(axes, start, stop, Ae_2025_table, Fb, Fe, Ae_initial):
+
+    # Evaluates the grid points start .. stop - 1 of the full factorial over the axes
+    index = np.arange(start, stop)
+    positions = np.unravel_index(index, tuple(len(axis) for axis in axes))
+
+    chunk = {'index': index}
+    for name, axis, position in zip(sweep_parameters, axes, positions):
+        chunk[name] = axis[position]
+
+    chunk['average_op_em'], chunk['average_emb_em'] = calculate_emissions_batch(
+        *(chunk[name] for name in sweep_parameters), Fb=Fb, Fe=Fe, Ae_initial=Ae_initial,
+        Ae_2025=Ae_2025_table[positions[3], positions[5]]
+    )
+    return chunk
+
+
+def sweep_chunks(GB, Fn, year_GHG_neutrality, rn, rr, rd, chunk_size=1_000_000, Fb=Fb, Fe=Fe, Ae_initial=Ae_initial):
+
+    # Yields the results of the full factorial over the given axes (1D arrays of values) in chunks.
+    # The grid points are enumerated in the order of the nested loops (GB outermost, rd innermost).
+    # Every chunk is a dict of NumPy column arrays with the keys
+    #   - 'index': Position of each grid point in the full factorial
+    #   - the sweep parameters (see sweep_parameters)
+    #   - the average operational and embodied emissions (see sweep_results)
+
+    axes = [np.asarray(axis) for axis in (GB, Fn, year_GHG_neutrality, rn, rr, rd)]
+    total = sweep_size(*axes)
+
+    # Pre-correction for every (rn, rd) pair of the axes, looked up per chunk instead of recalculated
+    Ae_2025_table = pre_correction(axes[3][:, None], axes[5][None, :], Ae_initial)
+
+    for start in range(0, total, chunk_size):
+        yield _evaluate_range(axes, start, min(start + chunk_size, total), Ae_2025_table, Fb, Fe, Ae_initial)
+
+
+def _sweep_task(axes, start, stop, Fb, Fe, Ae_initial):
+
+    # Work item of parallel_sweep(), executed in a worker process
+    t_start = time.perf_counter()
+    Ae_2025_table = pre_correction(axes[3][:, None], axes[5][None, :], Ae_initial)
+    chunk = _evaluate_range(axes, start, stop, Ae_2025_table, Fb, Fe, Ae_initial)
+    elapsed = time.perf_counter() - t_start
+    return chunk['average_op_em'], chunk['average_emb_em'], elapsed, os.getpid()
+
+
+def parallel_sweep(GB, Fn, year_GHG_neutrality, rn, rr, rd, chunk_size=None, max_workers=None,
+                   Fb=Fb, Fe=Fe, Ae_initial=Ae_initial):
+
+    # Evaluates the full factorial over the given axes on a process pool (default: one worker per CPU).
+    # The grid is split into chunks of 'chunk_size' points (default: about four chunks per worker, so the
+    # workers stay busy when chunks take different times); the results are reassembled in the order of the
+    # nested loops, independent of which worker finished first.
+
+    # Returns the average operational and embodied emissions (1D arrays over the grid) and a dict with:
+    #   - 'workers':               Number of worker processes
+    #   - 'points':                Number of evaluated grid points
+    #   - 'wall_time':             Elapsed time of the whole sweep in s
+    #   - 'compute_time':          Sum of the computation times of all chunks in s, measured inside the workers
+    #   - 'parallel_efficiency':   compute_time / (workers * wall_time): share of the wall time of the pool that
+    #                              is spent on computation. Pool start-up and the transfer of the chunks count
+    #                              as overhead; this is not a speedup measured against a serial run.
+    #   - 'throughput_per_worker': Evaluated grid points per second of computation for each worker process
+
+    axes = [np.asarray(axis) for axis in (GB, Fn, year_GHG_neutrality, rn, rr, rd)]
+    total = sweep_size(*axes)
+
+    if max_workers is None:
+        max_workers = os.cpu_count() or 1
+    if chunk_size is None:
+        chunk_size = max(1, -(-total // (4 * max_workers)))
+    bounds = [(start, min(start + chunk_size, total)) for start in range(0, total, chunk_size)]
+    max_workers = max(1, min(max_workers, len(bounds)))
+
+    average_op_em = np.empty(total)
+    average_emb_em = np.empty(total)
+    points_per_worker = {}
+    time_per_worker = {}
+
+    t_start = time.perf_counter()
+    with ProcessPoolExecutor(max_workers=max_workers) as executor:
+        futures = [
+            executor.submit(_sweep_task, axes, start, stop, Fb, Fe, Ae_initial) for start, stop in bounds
+        ]
+        for (start, stop), future in zip(bounds, futures):
+            average_op_em[start:stop], average_emb_em[start:stop], elapsed, pid = future.result()
+            points_per_worker[pid] = points_per_worker.get(pid, 0) + stop - start
+            time_per_worker[pid] = time_per_worker.get(pid, 0.0) + elapsed
+    wall_time = time.perf_counter() - t_start
+
+    compute_time = sum(time_per_worker.values())
+    stats = {
+        'workers': max_workers,
+        'points': total,
+        'wall_time': wall_time,
+        'compute_time': compute_time,
+        'parallel_efficiency': compute_time / (max_workers * wall_time) if wall_time > 0 else float('nan'),
+        'throughput_per_worker': {
+            pid: points_per_worker[pid] / time_per_worker[pid] if time_per_worker[pid] > 0 else float('nan')
+            for pid in points_per_worker
+        },
+    }
+
+    return average_op_em, average_emb_em, stats
+
+
+def write_sweep(directory, GB, Fn, year_GHG_neutrality, rn, rr, rd, chunk_size=1_000_000, columns=None,
+                Fb=Fb, Fe=Fe, Ae_initial=Ae_initial):
+
+    # Streams the sweep to disk with one .npy file per column (e.g. 'average_op_em.npy').
+    # The header of each file is written for the full grid and the chunks are appended one after another,
+    # so only one chunk is held in memory. 'columns' selects the stored columns (default: sweep parameters
+    # and results). The stored columns can be opened again with np.load(path, mmap_mode='r').
+
+    if columns is None:
+        columns = sweep_parameters + sweep_results
+
+    axes = (GB, Fn, year_GHG_neutrality, rn, rr, rd)
+    total = sweep_size(*axes)
+    if total == 0:
+        raise ValueError("The sweep grid is empty, at least one axis has no values")
+    os.makedirs(directory, exist_ok=True)
+    paths = [os.path.join(directory, name + '.npy') for name in columns]
+
+    chunks = sweep_chunks(*axes, chunk_size=chunk_size, Fb=Fb, Fe=Fe, Ae_initial=Ae_initial)
+    write_npy_chunks(dict(zip(columns, paths)), chunks, total)
+
+    return paths
@@ -0,0 +1,271 @@
+import json
+import os
+import shutil
+import tempfile
+
+import numpy as np
+
+from emission_engine import Ae_initial, Fb, Fe, model_constants
+from grid_spec import axis_values, grid_digest
+from result_cube import budget_table, cube_dims, cube_values, evaluate_block, sweep_cube
+
+# Persistent on-disk cache of sweep results. Every entry is addressed by a hash of the grid specification and
+# all model constants, so a rerun with identical inputs loads the stored result cube instead of recalculating
+# it. The arrays are stored as .npy files and opened memory-mapped. When the cache grows beyond its size limit,
+# the least recently used entries are removed. A grid that extends a cached grid (e.g. an additional year of
+# climate neutrality) is calculated incrementally: only the missing parameter combinations are evaluated.
+
+default_cache_dir = os.path.join(os.path.dirname(os.path.abspath(__file__)), '.sweep_cache')
+
+# Size limit of the cache in bytes
+default_max_bytes = 2 * 1024**3
+
+
+def cache_key(global_budget, Fn_values, stock_grid, Fb=Fb, Fe=Fe, Ae_initial=Ae_initial):
+
+    # Content address of a sweep: budget table, allocation factors, stock axes (see grid_spec.py) and constants
+    return grid_digest(global_budget, Fn_values, stock_grid, model_constants(Fb, Fe, Ae_initial))
+
+
+def _entry_size(path):
+
+    # Size of a cache entry in bytes
+    return sum(entry.stat().st_size for entry in os.scandir(path) if entry.is_file())
+
+
+def load_cube(key, cache_dir=default_cache_dir, mmap_mode='r'):
+
+    # Loads a result cube from the cache (None if the entry does not exist).
+    # The result arrays are memory-mapped with the given mmap_mode (None loads them into memory).
+
+    path = os.path.join(cache_dir, key)
+    if not os.path.isdir(path):
+        return None
+
+    with open(os.path.join(path, 'dims.json'), encoding='utf-8') as file:
+        dims = tuple(json.load(file))
+
+    cube = {
+        'dims': dims,
+        'coords': {dim: np.load(os.path.join(path, f'coord_{dim}.npy')) for dim in dims},
+        'Fn': np.load(os.path.join(path, 'Fn.npy')),
+    }
+    for name in cube_values:
+        cube[name] = np.load(os.path.join(path, name + '.npy'), mmap_mode=mmap_mode)
+
+    # Mark the entry as recently used for the eviction
+    os.utime(path)
+    return cube
+
+
+def store_cube(key, cube, cache_dir=default_cache_dir, max_bytes=default_max_bytes, meta=None):
+
+    # Stores a result cube in the cache and evicts the least recently used entries above max_bytes.
+    # The entry is written to a temporary directory first and then renamed, so readers never see partial entries.
+    # 'meta' describes the inputs of the sweep (see sweep_meta) and enables incremental extensions.
+
+    os.makedirs(cache_dir, exist_ok=True)
+    path = os.path.join(cache_dir, key)
+
+    temp_path = tempfile.mkdtemp(dir=cache_dir, prefix='.tmp-')
+    try:
+        with open(os.path.join(temp_path, 'dims.json'), 'w', encoding='utf-8') as file:
+            json.dump(list(cube['dims']), file)
+        if meta is not None:
+            with open(os.path.join(temp_path, 'meta.json'), 'w', encoding='utf-8') as file:
+                json.dump(meta, file)
+        for dim in cube['dims']:
+            np.save(os.path.join(temp_path, f'coord_{dim}.npy'), cube['coords'][dim])
+        np.save(os.path.join(temp_path, 'Fn.npy'), cube['Fn'])
+        for name in cube_values:
+            np.save(os.path.join(temp_path, name + '.npy'), np.ascontiguousarray(cube[name]))
+
+        if os.path.isdir(path):
+            shutil.rmtree(path)
+        os.replace(temp_path, path)
+    except BaseException:
+        shutil.rmtree(temp_path, ignore_errors=True)
+        raise
+
+    evict(cache_dir, max_bytes, keep=(key,))
+    return path
+
+
+def evict(cache_dir=default_cache_dir, max_bytes=default_max_bytes, keep=()):
+
+    # Removes the least recently used entries until the cache is not larger than max_bytes.
+    # Entries in 'keep' are never removed. Returns the keys of the removed entries.
+
+    if not os.path.isdir(cache_dir):
+        return []
+
+    entries = [entry for entry in os.scandir(cache_dir) if entry.is_dir() and not entry.name.startswith('.')]
+    sizes = {entry.name: _entry_size(entry.path) for entry in entries}
+    total = sum(sizes.values())
+
+    removed = []
+    for entry in sorted(entries, key=lambda entry: entry.stat().st_mtime):
+        if total <= max_bytes:
+            break
+        if entry.name in keep:
+            continue
+        shutil.rmtree(entry.path)
+        total -= sizes[entry.name]
+        removed.append(entry.name)
+
+    return removed
+
+
+def sweep_meta(global_budget, Fn_values, stock_grid, Fb=Fb, Fe=Fe, Ae_initial=Ae_initial):
+
+    # JSON description of the inputs of a sweep. Stock axis values are stored as exact decimal strings.
+    return {
+        'constants': grid_digest(model_constants(Fb, Fe, Ae_initial)),
+        'global_budget': [[temp_goal, prob, value] for (temp_goal, prob), value in global_budget.items()],
+        'Fn_values': [[label, value] for label, value in Fn_values.items()],
+        'stock_grid': [[axis.name, [str(value.normalize()) for value in axis.values]] for axis in stock_grid],
+    }
+
+
+def _meta_coords(meta):
+
+    # Coordinate keys of every cube axis of a sweep description, with the budget values and allocation factors
+    # that must agree for results to be shared
+    global_budget = {(temp_goal, prob): value for temp_goal, prob, value in meta['global_budget']}
+    temperatures, probabilities, _ = budget_table(global_budget)
+    coords = [list(temperatures), list(probabilities), [label for label, _ in meta['Fn_values']]]
+    coords += [values for _, values in meta['stock_grid']]
+    return coords, global_budget, dict(meta['Fn_values'])
+
+
+def _shared_positions(requested, cached):
+
+    # Positions of the shared coordinates on every axis of the requested and the cached grid.
+    # Returns None if the grids cannot share results (different constants or budget values).
+
+    if requested['constants'] != cached['constants']:
+        return None
+
+    coords_req, budget_req, Fn_req = _meta_coords(requested)
+    coords_cached, budget_cached, Fn_cached = _meta_coords(cached)
+    if any(budget_req[key] != budget_cached[key] for key in budget_req.keys() & budget_cached.keys()):
+        return None
+
+    shared = []
+    for dim, values_req, values_cached in zip(cube_dims, coords_req, coords_cached):
+        positions_req, positions_cached = [], []
+        for position, value in enumerate(values_req):
+            if value in values_cached and (dim != 'allocation' or Fn_req[value] == Fn_cached[value]):
+                positions_req.append(position)
+                positions_cached.append(values_cached.index(value))
+        shared.append((np.array(positions_req, dtype=np.intp), np.array(positions_cached, dtype=np.intp)))
+
+    # Every (temperature, probability) cell of the shared block is copied, so both budget tables must contain
+    # the same combinations there (a combination that is missing in one table is NaN in its cube)
+    temperatures = [coords_req[0][position] for position in shared[0][0]]
+    probabilities = [coords_req[1][position] for position in shared[1][0]]
+    for temp_goal in temperatures:
+        for prob in probabilities:
+            if ((temp_goal, prob) in budget_req) != ((temp_goal, prob) in budget_cached):
+                return None
+    return shared
+
+
+def _find_base(meta, key, cache_dir):
+
+    # Cached entry that shares the most grid points with the requested sweep (None if there is none)
+    best = None
+    if not os.path.isdir(cache_dir):
+        return best
+
+    for entry in os.scandir(cache_dir):
+        meta_path = os.path.join(entry.path, 'meta.json')
+        if entry.name == key or entry.name.startswith('.') or not os.path.isfile(meta_path):
+            continue
+        with open(meta_path, encoding='utf-8') as file:
+            cached_meta = json.load(file)
+        shared = _shared_positions(meta, cached_meta)
+        if shared is None:
+            continue
+        n_shared = int(np.prod([len(positions_req) for positions_req, _ in shared]))
+        if n_shared > 0 and (best is None or n_shared > best[2]):
+            best = (entry.name, shared, n_shared, cached_meta)
+    return best
+
+
+def cached_sweep_cube(global_budget, Fn_values, stock_grid, Fb=Fb, Fe=Fe, Ae_initial=Ae_initial,
+                      cache_dir=default_cache_dir, max_bytes=default_max_bytes):
+
+    # Result cube of the sweep (see result_cube.sweep_cube) over the stock axes of 'stock_grid'
+    # (year of climate neutrality, rn, rr, rd as GridAxis), loaded from the cache if the same inputs were
+    # calculated before. Otherwise the cached sweep that shares the most grid points is extended: its results
+    # are reused and only the missing combinations are evaluated. A cached sweep that is completely contained
+    # in the new one is replaced by it.
+
+    key = cache_key(global_budget, Fn_values, stock_grid, Fb, Fe, Ae_initial)
+    cube = load_cube(key, cache_dir)
+    if cube is not None:
+        return cube
+
+    meta = sweep_meta(global_budget, Fn_values, stock_grid, Fb, Fe, Ae_initial)
+    base = _find_base(meta, key, cache_dir)
+    stock_values = [axis_values(axis) for axis in stock_grid]
+
+    if base is None:
+        cube = sweep_cube(global_budget, Fn_values, *stock_values, Fb=Fb, Fe=Fe, Ae_initial=Ae_initial)
+        store_cube(key, cube, cache_dir, max_bytes, meta)
+        return cube
+
+    base_key, shared, _, base_meta = base
+    base_cube = load_cube(base_key, cache_dir)
+
+    temperatures, probabilities, GB = budget_table(global_budget)
+    Fn = np.array(list(Fn_values.values()))
+    coords = [temperatures, probabilities, np.array(list(Fn_values.keys()))] + stock_values
+    shape = tuple(len(coord) for coord in coords)
+
+    results = {name: np.empty(shape) for name in cube_values}
+
+    # Shared grid points are copied from the cached sweep
+    positions_req = np.ix_(*(positions for positions, _ in shared))
+    positions_cached = np.ix_(*(positions for _, positions in shared))
+    for name in cube_values:
+        results[name][positions_req] = base_cube[name][positions_cached]
+
+    # The missing grid points are split into disjoint blocks: for every axis k, the shared coordinates of the
+    # axes before k, the new coordinates of axis k and all coordinates of the axes after k
+    for k in range(len(cube_dims)):
+        block = []
+        for axis, (coord, (positions, _)) in enumerate(zip(coords, shared)):
+            if axis < k:
+                block.append(positions)
+            elif axis == k:
+                block.append(np.setdiff1d(np.arange(len(coord)), positions))
+            else:
+                block.append(np.arange(len(coord)))
+        if any(len(positions) == 0 for positions in block):
+            continue
+
+        block_results = evaluate_block(
+            GB[np.ix_(block[0], block[1])], Fn[block[2]], *(coord[positions] for coord, positions in zip(coords[3:], block[3:])),
+            Fb=Fb, Fe=Fe, Ae_initial=Ae_initial
+        )
+        for name, values in zip(cube_values, block_results):
+            results[name][np.ix_(*block)] = values
+
+    # Round-trip check: the merged results are NaN exactly where the budget table has no entry
+    missing = np.isnan(GB)[(...,) + (None,) * (len(cube_dims) - 2)]
+    if any(np.any(np.isnan(results[name]) != missing) for name in cube_values):
+        raise RuntimeError(f"Extension of cached sweep '{base_key}' does not match the requested budget table")
+
+    cube = {'dims': cube_dims, 'coords': dict(zip(cube_dims, coords)), 'Fn': Fn}
+    cube.update(results)
+    store_cube(key, cube, cache_dir, max_bytes, meta)
+
+    # Merge: the cached sweep is no longer needed if all of its grid points are part of the new one
+    base_coords, _, _ = _meta_coords(base_meta)
+    if all(len(positions) == len(values) for (_, positions), values in zip(shared, base_coords)):
+        del base_cube
+        shutil.rmtree(os.path.join(cache_dir, base_key), ignore_errors=True)
+
+    return cube
@@ -0,0 +1,110 @@
+import numpy as np
+from scipy.signal import fftconvolve
+
+# Dynamic LCA stage for emission trajectories. The dynamic budgets count every kg CO2e the same, regardless of
+# when it is emitted. Here yearly emissions (e.g. dynamic(t) of dynamic_oe_budget.py / dynamic_ee_budget.py, or
+# the trajectories of the static engine) are converted into their climate effect over time:
+#   1) Radiative forcing: convolution of the emissions with the IPCC CO2 impulse response function
+#   2) Warming: convolution of the radiative forcing with the IPCC temperature impulse response
+# Both convolutions are calculated with FFTs along the year axis for whole batches of trajectories, so
+# thousands of scenarios can be ranked by their climate effect instead of by their cumulative mass.
+# All emissions are treated as CO2 (kg CO2e).
+
+# CO2 impulse response function (IPCC AR5, Joos et al. 2013): share of a CO2 pulse remaining in the atmosphere
+#   IRF(t) = a0 + sum_i a_i * exp(-t / tau_i)
+irf_a0 = 0.2173
+irf_a = np.array([0.2240, 0.2824, 0.2763])
+irf_tau = np.array([394.4, 36.54, 4.304])   # years
+
+# Radiative efficiency of CO2 in W/m² per kg (IPCC AR5, consistent with AGWP100 = 9.17e-14 W·a/(m²·kg))
+radiative_efficiency = 1.7517e-15
+
+# Temperature impulse response to radiative forcing (IPCC AR5, Boucher & Reddy 2008)
+#   R(t) = sum_j c_j / d_j * exp(-t / d_j)
+temperature_c = np.array([0.631, 0.429])    # K per W/m²
+temperature_d = np.array([8.4, 409.5])      # years
+
+# Default time horizon in years after the first emission year
+time_horizon = 100
+
+
+def co2_impulse_response(t):
+
+    # Share of a CO2 pulse that remains in the atmosphere t years after its emission
+    t = np.asarray(t, dtype=float)[..., None]
+    return irf_a0 + np.sum(irf_a * np.exp(-t / irf_tau), axis=-1)
+
+
+def forcing_kernel(n_years):
+
+    # Average radiative forcing in W/m² in year m (m = 0 .. n_years - 1) after the emission of 1 kg CO2 at the
+    # start of year 0: radiative_efficiency * ∫_m^(m+1) IRF(t) dt (integrated analytically)
+    m = np.arange(n_years)[:, None]
+    decay = np.sum(irf_a * irf_tau * (np.exp(-m / irf_tau) - np.exp(-(m + 1) / irf_tau)), axis=-1)
+    return radiative_efficiency * (irf_a0 + decay)
+
+
+def temperature_kernel(n_years):
+
+    # Warming in K at the end of year q (q = 0 .. n_years - 1) caused by a radiative forcing of 1 W/m² that
+    # lasts for year 0: ∫_0^1 R(q + 1 - s) ds (integrated analytically)
+    q = np.arange(n_years)[:, None]
+    return np.sum(temperature_c * (np.exp(-q / temperature_d) - np.exp(-(q + 1) / temperature_d)), axis=-1)
+
+
+def _convolve_years(values, kernel, n_years):
+
+    # Causal convolution along the last axis, truncated to n_years (the input is padded with zeros).
+    # Non-finite entries (e.g. the NaN padding after the year of climate neutrality of emissions_matrix() or
+    # dynamic_pipeline.dynamic_chunks()) count as zero, otherwise the FFT would spread them over the whole row.
+    values = np.asarray(values, dtype=float)
+    values = np.where(np.isfinite(values), values, 0.0)
+    if values.shape[-1] < n_years:
+        padding = np.zeros(values.shape[:-1] + (n_years - values.shape[-1],))
+        values = np.concatenate([values, padding], axis=-1)
+    kernel = kernel.reshape((1,) * (values.ndim - 1) + kernel.shape)
+    return fftconvolve(values[..., :n_years], kernel, axes=-1)[..., :n_years]
+
+
+def radiative_forcing(emissions, n_years=time_horizon):
+
+    # Radiative forcing in W/m² in every year after the first emission year (... x n_years).
+    # emissions: Yearly emissions in kg CO2e (... x years), e.g. a batch of trajectories (scenarios x years);
+    #            NaN entries are treated as years without emissions
+    return _convolve_years(emissions, forcing_kernel(n_years), n_years)
+
+
+def warming(forcing):
+
+    # Global mean temperature change in K at the end of every year (... x n_years) for a forcing trajectory
+    n_years = np.shape(forcing)[-1]
+    return _convolve_years(forcing, temperature_kernel(n_years), n_years)
+
+
+def climate_metrics(emissions, n_years=time_horizon):
+
+    # Climate effect of a batch of emission trajectories (... x years) over n_years after the first year:
+    #   - mass:               Cumulative emissions in kg CO2e (as counted by the dynamic budgets)
+    #   - forcing:            Radiative forcing in W/m² per year (... x n_years)
+    #   - cumulative_forcing: Radiative forcing integrated over the time horizon in W·a/m²
+    #   - temperature:        Temperature change in K per year (... x n_years)
+    #   - peak_temperature:   Maximum temperature change in K within the time horizon
+    forcing = radiative_forcing(emissions, n_years)
+    temperature = warming(forcing)
+    return {
+        'mass': np.nansum(emissions, axis=-1),
+        'forcing': forcing,
+        'cumulative_forcing': np.sum(forcing, axis=-1),
+        'temperature': temperature,
+        'peak_temperature': np.max(temperature, axis=-1),
+    }
+
+
+def rank_by_climate_effect(emissions, metric='cumulative_forcing', n_years=time_horizon):
+
+    # Ranks emission trajectories (scenarios x years) by their climate effect, lowest first.
+    # Returns the order of the scenarios and the values of the metric ('cumulative_forcing' or 'peak_temperature').
+    if metric not in ('cumulative_forcing', 'peak_temperature'):
+        raise ValueError(f"Unknown metric '{metric}', expected 'cumulative_forcing' or 'peak_temperature'")
+    values = climate_metrics(emissions, n_years)[metric]
+    return np.argsort(values, kind='stable'), values
@@ -0,0 +1,106 @@
+import numpy as np
+import pandas as pd
+
+from shape_functions import combined_value, electricity_params, embodied_params, heating_params, year_integral
+
+# Batched version of solve_for_a_b() of dynamic_oe_budget.py and dynamic_ee_budget.py. The dynamic budget
+# dynamic(t) = a + b * Z(t) has to fulfil, for every scenario:
+#   (1) dynamic(T_max) = factor * dynamic(T_min)   ->  (1 - factor) * a + (Z(T_max) - factor * Z(T_min)) * b = 0
+#   (2) ∫ dynamic(t) dt = x_base * (T_max - T_min) ->  (T_max - T_min) * a + I_Z * b = x_base * (T_max - T_min)
+# The 2x2 systems of all scenarios are stacked and solved together. The static base levels, end-ratio factors,
+# years of climate neutrality and the parameters of the shape functions may all be arrays.
+
+# First year of the dynamic budget
+T_min = 2025
+
+# Weight factor of the operational budget (share of electricity vs. heating)
+w = 0.137
+
+# End-ratio factors dynamic(T_max) / dynamic(T_min)
+operational_factor = w * (4.3 / 42.2) + (1 - w) * (11.6 / 71.9)  # Electricity and heating mix
+embodied_factor = 5.9 / 47.7                                     # Embodied emissions of building materials
+
+
+def operational_components(w=w, heating_params=heating_params, electricity_params=electricity_params):
+
+    # Z(t) of the operational budget: (1 - w) * heating (sigmoid) + w * electricity (sinusoid)
+    return [(1 - w, 'sigmoid', heating_params), (w, 'sinusoid', electricity_params)]
+
+
+def embodied_components(embodied_params=embodied_params):
+
+    # Z(t) of the embodied budget: emissions of building materials (cubic)
+    return [(1, 'cubic', embodied_params)]
+
+
+def solve_a_b(x_base, factor, Z_start, Z_end, I_Z, T_min=T_min, T_max=2045):
+
+    # Solves the stacked systems for a and b (arrays with the broadcast shape of the inputs).
+    #   - x_base:         Static budget level in kg CO2e/(m²·a)
+    #   - factor:         End-ratio factor dynamic(T_max) / dynamic(T_min)
+    #   - Z_start, Z_end: Z(T_min) and Z(T_max)
+    #   - I_Z:            Integral of Z(t) over [T_min..T_max]
+    x_base, factor, Z_start, Z_end, I_Z, span = np.broadcast_arrays(
+        *(np.asarray(x, dtype=float) for x in (x_base, factor, Z_start, Z_end, I_Z, np.subtract(T_max, T_min)))
+    )
+
+    matrix = np.stack([
+        np.stack([1 - factor, Z_end - factor * Z_start], axis=-1),
+        np.stack([span, I_Z], axis=-1),
+    ], axis=-2)
+    rhs = np.stack([np.zeros_like(x_base), x_base * span], axis=-1)
+
+    solution = np.linalg.solve(matrix, rhs[..., None])[..., 0]
+    return solution[..., 0][()], solution[..., 1][()]
+
+
+def solve_dynamic_budget(x_base, factor, components, T_min=T_min, T_max=2045):
+
+    # a and b of the dynamic budgets for a batch of scenarios. components is a list of (weight, shape, params) as
+    # returned by operational_components() / embodied_components(), with scalar or array weights and parameters.
+    # T_max (year of climate neutrality) may differ between the scenarios.
+    Z_start = combined_value(components, 0.0)
+    Z_end = combined_value(components, 1.0)
+    I_Z = year_integral(components, T_min, T_max)
+    return solve_a_b(x_base, factor, Z_start, Z_end, I_Z, T_min, T_max)
+
+
+def dynamic_values(a, b, components, t, T_min=T_min, T_max=2045):
+
+    # dynamic(t) = a + b * Z(t) on the scaled time axis x = (t - T_min) / (T_max - T_min).
+    # All inputs broadcast, e.g. a, b and T_max of shape (scenarios x 1) and t of shape (years).
+    x = (np.asarray(t, dtype=float) - T_min) / (np.asarray(T_max, dtype=float) - T_min)
+    return a + b * combined_value(components, x)
+
+
+def shape_function(components):
+
+    # Array-native Z(x) of a list of shape components on the scaled time axis (x of any shape)
+    def Z(x):
+        return combined_value(components, np.asarray(x, dtype=float))
+    return Z
+
+
+def dynamic_function(a, b, components, T_min=T_min, T_max=2045):
+
+    # Array-native dynamic(t) for the years t (scalars, 1D or 2D arrays, fractional years are allowed).
+    # For a batch of scenarios (a, b and T_max as 1D arrays) every scenario gets its own row: a 1D time grid
+    # gives a (scenario x time) array, a 2D time grid has one row of times per scenario.
+    a, b, T_max = (np.asarray(x, dtype=float) for x in (a, b, T_max))
+    if max(a.ndim, b.ndim, T_max.ndim) > 0:
+        a, b, T_max = (x[..., None] for x in np.broadcast_arrays(a, b, T_max))
+
+    def dynamic(t):
+        return dynamic_values(a, b, components, np.asarray(t, dtype=float), T_min, T_max)
+    return dynamic
+
+
+def dynamic_table(dynamic, t, name='Dynamic GHG Budget', time_name='Year'):
+
+    # Evaluates dynamic(t) on a whole time grid in one call and returns it as a DataFrame:
+    # one row per time step for a single budget, or one row per scenario and one column per time step for a batch
+    t = np.asarray(t)
+    values = dynamic(t)
+    if np.ndim(values) == 1:
+        return pd.DataFrame({time_name: t, name: values})
+    return pd.DataFrame(values, columns=pd.Index(t, name=time_name))
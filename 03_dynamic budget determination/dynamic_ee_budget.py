@@ -1,7 +1,7 @@
 import numpy as np
 import matplotlib.pyplot as plt
-import pandas as pd
-from scipy.integrate import quad
+from dynamic_budget import dynamic_table
+from shape_functions import cubic, embodied_params, year_integral
 from matplotlib.ticker import MaxNLocator
 
 # Key parameters for the time period and the constant budget
@@ -17,8 +17,8 @@ I_constant = x_e_base * (T_max - T_min)
 # Fitted function for embodied emissions
 def f(x):
     # Sigmoid fit for the share of non-renewable heating.
-    # Example parameters from previous analysis.
-    return -85.68522642828206 * x**3 + 182.2869409438485 * x**2 + -138.8758533234043 * x + 47.363212824263705
+    # Example parameters from previous analysis (see shape_functions.py).
+    return cubic(x, *embodied_params)
 
 def scale_year(year):
     # Scale a given year between T_min and T_max onto the range [0..1]
@@ -29,6 +29,9 @@ def Z(year):
     x = scale_year(year)
     return f(x)
 
+# Components of Z(t) for the analytic integrals: (weight, shape function, parameters)
+Z_components = [(1, 'cubic', embodied_params)]
+
 # We want dynamic(t) = a + b*Z(t) such that:
 #       (a) The integral over [T_min..T_max] equals I_constant
 #       (b) dynamic(2045) = 0.15 * dynamic(2025)
@@ -37,11 +40,8 @@ def Z(year):
 Z_2025 = Z(T_min)
 Z_2045 = Z(T_max)
 
-# Compute the integral of Z(t) over [2025..2045]
-def Z_of_t(t):
-    return Z(t)
-
-I_Z, _ = quad(Z_of_t, T_min, T_max)
+# Compute the integral of Z(t) over [2025..2045] (exact, with the antiderivatives of the shape functions)
+I_Z = year_integral(Z_components, T_min, T_max)
 
 #   dynamic budget (2025) = a + b * Z_2025
 #   dynamic budget (2045) = a + b * Z_2045
@@ -88,12 +88,16 @@ def dynamic(t):
     # Define the dynamic GHG budget function: dynamic(t) = a + b * Z(t)
     return a + b * Z(t)
 
+def dynamic_integral(t_low, t_high):
+    # Exact integral of dynamic(t) from t_low to t_high
+    return a * (t_high - t_low) + b * year_integral(Z_components, T_min, T_max, t_low, t_high)
+
 # Plot and verification
 
 # Check that dynamic(2045)/dynamic(2025) ~ 0.15 and that the integral is correct
 
 ratio_2045_2025 = dynamic(T_max)/dynamic(T_min)
-I_dynamic, _ = quad(dynamic, T_min, T_max)
+I_dynamic = dynamic_integral(T_min, T_max)
 
 print(f"Z(2025) = {Z_2025:.3f},   Z(2045) = {Z_2045:.3f}")
 print("a =", a, "   b =", b)
@@ -105,7 +109,7 @@ print(f"I_dynamic   = {I_dynamic:.4f}\n")
 plt.rcParams["font.family"] = "Arial"  # Setzt die Schriftart auf Arial
 
 years = np.arange(T_min, T_max+1)
-dyn_vals = [dynamic(y) for y in years]
+dyn_vals = dynamic(years)
 
 plt.figure(figsize=(8,6))
 # Plot the static GHG budget line
@@ -147,11 +151,9 @@ ax = plt.gca()
 ax.xaxis.set_major_locator(MaxNLocator(integer=True))
 plt.show()
 
-dyn_results = {year: dynamic(year) for year in years}
-
-# Convert results to DataFrame
-df_results = pd.DataFrame(list(dyn_results.items()), columns=["Year", "Dynamic GHG Budget"])
+# Results for all years as DataFrame (dynamic(t) is evaluated for the whole horizon at once)
+df_results = dynamic_table(dynamic, years)
 
 # Print results for each year
-for year, value in dyn_results.items():
+for year, value in zip(df_results["Year"], df_results["Dynamic GHG Budget"]):
     print(f"{year}: {value:.2f} kgCO₂e/(m²·a)")
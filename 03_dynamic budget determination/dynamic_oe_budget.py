@@ -1,7 +1,7 @@
 import numpy as np
 import matplotlib.pyplot as plt
-import pandas as pd
-from scipy.integrate import quad
+from dynamic_budget import dynamic_table
+from shape_functions import electricity_params, heating_params, sigmoid, sinusoid, year_integral
 from matplotlib.ticker import MaxNLocator
 
 
@@ -19,13 +19,13 @@ I_constant = x_op_base * (T_max - T_min)
 
 def f(x):
     # Sigmoid fit for the share of non-renewable heating.
-    # Example parameters from previous analysis.
-    return 88.71710115840355 / (1 + np.exp(-(-3.348762256837263) * (x - 0.4505688285851687)))
+    # Example parameters from previous analysis (see shape_functions.py).
+    return sigmoid(x, *heating_params)
 
 def g(x):
     # Sinusoidal fit for the share of non-renewable electricity.
-    # Example parameters from previous analysis.
-    return 36.10080564331148 * np.sin(0.3155578919710513 * x + 3.058151974258264) + 39.54060321870498
+    # Example parameters from previous analysis (see shape_functions.py).
+    return sinusoid(x, *electricity_params)
 
 # Weight factor (share of electricity vs. heating)
 w = 0.137
@@ -42,6 +42,9 @@ def Z(year):
     x = scale_year(year)
     return (1 - w) * f(x) + w * g(x)
 
+# Components of Z(t) for the analytic integrals: (weight, shape function, parameters)
+Z_components = [(1 - w, 'sigmoid', heating_params), (w, 'sinusoid', electricity_params)]
+
 # We want dynamic(t) = a + b*Z(t) such that:
 #       (a) The integral over [T_min..T_max] equals I_constant
 #       (b) dynamic(2045) = 0.15 * dynamic(2025)
@@ -50,11 +53,8 @@ def Z(year):
 Z_2025 = Z(T_min)
 Z_2045 = Z(T_max)
 
-# Compute the integral of Z(t) over [2025..2045]
-def Z_of_t(t):
-    return Z(t)
-
-I_Z, _ = quad(Z_of_t, T_min, T_max)
+# Compute the integral of Z(t) over [2025..2045] (exact, with the antiderivatives of the shape functions)
+I_Z = year_integral(Z_components, T_min, T_max)
 
 # We aim for:
 #   dynamic budget (2025) = a + b * Z_2025
@@ -102,11 +102,15 @@ def dynamic(t):
     # Define the dynamic GHG budget function: dynamic(t) = a + b * Z(t)
     return a + b * Z(t)
 
+def dynamic_integral(t_low, t_high):
+    # Exact integral of dynamic(t) from t_low to t_high
+    return a * (t_high - t_low) + b * year_integral(Z_components, T_min, T_max, t_low, t_high)
+
 # Plot and verification
 
 # Check that dynamic(2045)/dynamic(2025) ~ 0.15 and that the integral is correct
 ratio_2045_2025 = dynamic(T_max) / dynamic(T_min)
-I_dynamic, _ = quad(dynamic, T_min, T_max)
+I_dynamic = dynamic_integral(T_min, T_max)
 
 print(f"Z(2025) = {Z_2025:.3f},   Z(2045) = {Z_2045:.3f}")
 print("a =", a, "   b =", b)
@@ -118,7 +122,7 @@ print(f"I_dynamic   = {I_dynamic:.4f}\n")
 plt.rcParams["font.family"] = "Arial"
 
 years = np.arange(T_min, T_max + 1)
-dyn_vals = [dynamic(y) for y in years]
+dyn_vals = dynamic(years)
 
 plt.figure(figsize=(8, 6))
 
@@ -164,11 +168,9 @@ ax.xaxis.set_major_locator(MaxNLocator(integer=True))
 
 plt.show()
 
-dyn_results = {year: dynamic(year) for year in years}
-
-# Convert results to DataFrame
-df_results = pd.DataFrame(list(dyn_results.items()), columns=["Year", "Dynamic GHG Budget"])
+# Results for all years as DataFrame (dynamic(t) is evaluated for the whole horizon at once)
+df_results = dynamic_table(dynamic, years)
 
 # Print results for each year
-for year, value in dyn_results.items():
+for year, value in zip(df_results["Year"], df_results["Dynamic GHG Budget"]):
     print(f"{year}: {value:.2f} kgCO₂e/(m²·a)")
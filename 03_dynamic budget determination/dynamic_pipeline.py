@@ -0,0 +1,102 @@
+import os
+import sys
+
+import numpy as np
+
+from dynamic_budget import (
+    T_min, dynamic_values, embodied_components, embodied_factor, operational_components, operational_factor,
+    solve_dynamic_budget,
+)
+
+# The streaming .npy writer is shared with the sweep of "01_static budget determination"
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), os.pardir, '01_static budget determination'))
+from npy_stream import write_npy_chunks
+
+# Pipeline from the static sweep of "01_static budget determination" to dynamic budgets: the static results
+# per m² of every scenario (average operational and embodied emissions and the year of climate neutrality)
+# are turned into yearly dynamic budget curves, as dynamic_oe_budget.py and dynamic_ee_budget.py do for the
+# single static levels 3.86 and 2.41. The scenarios are processed in chunks: the a/b systems of a chunk are
+# solved together and the curves are evaluated as one (scenario x year) array. All curves share the year axis
+# 2025 .. latest year of climate neutrality; the years after the climate neutrality of a scenario are NaN.
+
+# Dynamic budget curves that are produced for every scenario
+dynamic_outputs = ('dynamic_op', 'dynamic_emb')
+
+
+def cube_scenarios(cube):
+
+    # Flat scenario arrays of a result cube of the static sweep (see result_cube.py in "01_static budget
+    # determination"): static operational and embodied levels and the year of climate neutrality of every entry
+    axis = cube['dims'].index('year_GHG_neutrality')
+    shape = np.shape(cube['average_op_em'])
+    years = np.asarray(cube['coords']['year_GHG_neutrality']).reshape((-1,) + (1,) * (len(shape) - axis - 1))
+    return (
+        np.ravel(cube['average_op_em']),
+        np.ravel(cube['average_emb_em']),
+        np.broadcast_to(years, shape).ravel(),
+    )
+
+
+def dynamic_years(year_GHG_neutrality):
+
+    # Shared year axis of the dynamic budget curves: 2025 .. latest year of climate neutrality
+    return np.arange(T_min, int(np.max(year_GHG_neutrality)) + 1)
+
+
+def dynamic_chunks(x_op_base, x_e_base, year_GHG_neutrality, chunk_size=2**16, operational=None, embodied=None,
+                   op_factor=operational_factor, emb_factor=embodied_factor):
+
+    # Yields the dynamic budget curves of the scenarios in chunks.
+    #   - x_op_base, x_e_base: Static operational and embodied budget levels in kg CO2e/(m²·a) (scenarios)
+    #   - year_GHG_neutrality: Year of climate neutrality (T_max) of every scenario
+    #   - operational, embodied: Shape components of Z(t) (default: the fits of the dynamic budget scripts)
+    # Every chunk is a dict with 'start' (index of its first scenario), 'years' and the (scenario x year) arrays
+    # 'dynamic_op' and 'dynamic_emb' in kg CO2e/(m²·a).
+
+    operational = operational_components() if operational is None else operational
+    embodied = embodied_components() if embodied is None else embodied
+    x_op_base, x_e_base, year_GHG_neutrality = np.broadcast_arrays(x_op_base, x_e_base, year_GHG_neutrality)
+
+    years = dynamic_years(year_GHG_neutrality)
+    for start in range(0, len(x_op_base), chunk_size):
+        stop = min(start + chunk_size, len(x_op_base))
+        T_max = np.asarray(year_GHG_neutrality[start:stop], dtype=float)[:, None]
+        valid = years <= T_max
+
+        chunk = {'start': start, 'years': years}
+        for name, x_base, factor, components in (
+            ('dynamic_op', x_op_base, op_factor, operational),
+            ('dynamic_emb', x_e_base, emb_factor, embodied),
+        ):
+            a, b = solve_dynamic_budget(x_base[start:stop, None], factor, components, T_min, T_max)
+            chunk[name] = np.where(valid, dynamic_values(a, b, components, years, T_min, T_max), np.nan)
+        yield chunk
+
+
+def dynamic_trajectories(x_op_base, x_e_base, year_GHG_neutrality, chunk_size=2**16, **options):
+
+    # Same as dynamic_chunks(), with all chunks concatenated: returns the years and the (scenario x year) arrays
+    # of the operational and embodied dynamic budgets
+    chunks = list(dynamic_chunks(x_op_base, x_e_base, year_GHG_neutrality, chunk_size, **options))
+    years = chunks[0]['years'] if chunks else np.arange(T_min, T_min)
+    return (years,) + tuple(
+        np.concatenate([chunk[name] for chunk in chunks]) if chunks else np.empty((0, len(years)))
+        for name in dynamic_outputs
+    )
+
+
+def write_dynamic(directory, x_op_base, x_e_base, year_GHG_neutrality, chunk_size=2**16, **options):
+
+    # Streams the dynamic budget curves to disk: 'years.npy' and one (scenario x year) .npy file per output.
+    # The headers are written for the full arrays and the chunks are appended, so only one chunk is held in
+    # memory. The files can be opened again with np.load(path, mmap_mode='r').
+
+    n_scenarios = np.broadcast_shapes(np.shape(x_op_base), np.shape(x_e_base), np.shape(year_GHG_neutrality))[0]
+    os.makedirs(directory, exist_ok=True)
+    paths = {name: os.path.join(directory, name + '.npy') for name in dynamic_outputs}
+
+    np.save(os.path.join(directory, 'years.npy'), dynamic_years(year_GHG_neutrality))
+    chunks = dynamic_chunks(x_op_base, x_e_base, year_GHG_neutrality, chunk_size, **options)
+    write_npy_chunks(paths, chunks, n_scenarios)
+
+    return paths
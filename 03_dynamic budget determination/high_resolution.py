@@ -0,0 +1,89 @@
+import numpy as np
+import pandas as pd
+
+from dynamic_budget import T_min, operational_components, operational_factor, solve_dynamic_budget
+from shape_functions import combined_integral
+
+# Dynamic budgets at monthly or daily resolution. The budget of every time step is the integral of
+# dynamic(t) over the step (calendar months and days, including leap years), calculated exactly with the
+# antiderivatives of the shape functions. The steps of a year therefore add up to the annual integral of
+# dynamic(t), and all years add up to the total budget. The evaluation runs in chunks of scenarios and years,
+# so long horizons at daily resolution and many scenarios are never held in memory at once.
+
+resolutions = {'month': 'M', 'day': 'D'}
+
+
+def step_edges(first_year, last_year, resolution='month'):
+
+    # Start dates of the time steps from the first day of first_year up to the last day of last_year, and the
+    # step edges as fractional years (one more edge than steps): year + elapsed days / days of the year
+    if resolution not in resolutions:
+        raise ValueError(f"Unknown resolution '{resolution}', expected one of {tuple(resolutions)}")
+
+    unit = resolutions[resolution]
+    edges = np.arange(np.datetime64(str(first_year), unit), np.datetime64(str(last_year + 1), unit) + 1)
+    days = edges.astype('datetime64[D]')
+
+    year = days.astype('datetime64[Y]')
+    year_start = year.astype('datetime64[D]')
+    year_length = ((year + 1).astype('datetime64[D]') - year_start).astype(float)
+    fraction = year.astype(int) + 1970 + (days - year_start).astype(float) / year_length
+
+    return days[:-1], fraction
+
+
+def step_budgets(a, b, components, edges, T_min=T_min, T_max=2045):
+
+    # Budget of every time step in kg CO2e/m²: ∫ dynamic(t) dt between consecutive edges (fractional years).
+    # a, b and T_max may be arrays of scenarios (scenarios x 1) that share the shape components; the result is
+    # (scenarios x steps). The antiderivative of Z is evaluated once per edge and distinct year of climate
+    # neutrality, and the primitive is differenced, so the steps add up exactly.
+    a, b, T_max = (np.asarray(x, dtype=float) for x in (a, b, T_max))
+    spans, inverse = np.unique(T_max - T_min, return_inverse=True)
+    Z_primitive = spans[:, None] * combined_integral(components, 0.0, (edges - T_min) / spans[:, None])
+    # Rows of the distinct spans for every scenario (the year axis of T_max is replaced by the edges)
+    primitive = Z_primitive[inverse.reshape(T_max.shape)].reshape(T_max.shape[:-1] + (len(edges),))
+    primitive *= b
+    primitive += a * edges
+    return np.diff(primitive, axis=-1)
+
+
+def high_resolution_chunks(a, b, components, T_min=T_min, T_max=2045, resolution='month', chunk_size=2**11,
+                           years_per_chunk=5):
+
+    # Yields the step budgets of a batch of scenarios (a, b, T_max as 1D arrays or scalars) in blocks of
+    # chunk_size scenarios and years_per_chunk years. Every block is a dict with 'start' (index of its first
+    # scenario), 'steps' (start dates) and 'budget' (scenarios x steps) in kg CO2e/m². Steps after the year of
+    # climate neutrality of a scenario are NaN.
+    # With the defaults at daily resolution, 'budget' holds 2048 x 1827 values (about 30 MB). The primitive at
+    # the step edges and its temporaries need about twice that while a block is calculated, so the peak memory
+    # is about 90 MB independent of the number of scenarios and the horizon.
+
+    a, b, T_max = (np.atleast_1d(x) for x in np.broadcast_arrays(a, b, T_max))
+    last_year = int(np.max(T_max)) - 1
+
+    for start in range(0, len(a), chunk_size):
+        stop = min(start + chunk_size, len(a))
+        scenario_T_max = np.asarray(T_max[start:stop], dtype=float)[:, None]
+        for first_year in range(T_min, last_year + 1, years_per_chunk):
+            steps, edges = step_edges(first_year, min(first_year + years_per_chunk - 1, last_year), resolution)
+            budget = step_budgets(a[start:stop, None], b[start:stop, None], components, edges, T_min, scenario_T_max)
+            budget[edges[1:] > scenario_T_max] = np.nan
+            yield {'start': start, 'steps': steps, 'budget': budget}
+
+
+def high_resolution_budget(x_op_base=3.86, resolution='month', factor=operational_factor, components=None,
+                           T_min=T_min, T_max=2045):
+
+    # Dynamic operational budget of one scenario (as dynamic_oe_budget.py) per month or day as DataFrame with
+    # the start of every step, the budget of the step in kg CO2e/m² and the average rate in kg CO2e/(m²·a)
+    components = operational_components() if components is None else components
+    a, b = solve_dynamic_budget(x_op_base, factor, components, T_min, T_max)
+
+    steps, edges = step_edges(T_min, T_max - 1, resolution)
+    budget = step_budgets(a, b, components, edges, T_min, T_max)
+    return pd.DataFrame({
+        'Start': steps,
+        'Dynamic GHG Budget': budget,
+        'Dynamic GHG Budget Rate': budget / np.diff(edges),
+    })
@@ -0,0 +1,90 @@
+import numpy as np
+
+# Shape functions of the dynamic budgets and their closed-form antiderivatives. The fitted functions of
+# "02_functions for emission development" are compositions of sigmoid, sinusoid and cubic terms, so their
+# integrals can be calculated exactly instead of with numerical quadrature. All parameters may be arrays
+# (e.g. one set of fit parameters per scenario); the results broadcast.
+
+# Fit parameters of the scripts in this folder
+heating_params = (88.71710115840355, -3.348762256837263, 0.4505688285851687)                         # sigmoid
+electricity_params = (36.10080564331148, 0.3155578919710513, 3.058151974258264, 39.54060321870498)  # sinusoid
+embodied_params = (-85.68522642828206, 182.2869409438485, -138.8758533234043, 47.363212824263705)   # cubic
+
+
+def sigmoid(x, L, k, x0):
+
+    # L / (1 + exp(-k * (x - x0)))
+    return L / (1 + np.exp(-k * (x - x0)))
+
+
+def sigmoid_antiderivative(x, L, k, x0):
+
+    # L / k * log(1 + exp(k * (x - x0))), evaluated with logaddexp to avoid overflow
+    return L / k * np.logaddexp(0, k * (x - x0))
+
+
+def sinusoid(x, A, omega, phi, c):
+
+    # A * sin(omega * x + phi) + c
+    return A * np.sin(omega * x + phi) + c
+
+
+def sinusoid_antiderivative(x, A, omega, phi, c):
+
+    # -A / omega * cos(omega * x + phi) + c * x
+    return -A / omega * np.cos(omega * x + phi) + c * x
+
+
+def cubic(x, c3, c2, c1, c0):
+
+    # c3 * x³ + c2 * x² + c1 * x + c0
+    return ((c3 * x + c2) * x + c1) * x + c0
+
+
+def cubic_antiderivative(x, c3, c2, c1, c0):
+
+    # c3 / 4 * x⁴ + c2 / 3 * x³ + c1 / 2 * x² + c0 * x
+    return (((c3 / 4 * x + c2 / 3) * x + c1 / 2) * x + c0) * x
+
+
+# Supported shape functions: name -> (function, antiderivative)
+shape_functions = {
+    'sigmoid': (sigmoid, sigmoid_antiderivative),
+    'sinusoid': (sinusoid, sinusoid_antiderivative),
+    'cubic': (cubic, cubic_antiderivative),
+}
+
+
+def shape_value(shape, x, params):
+
+    # Value of a shape function at x (on the scaled time axis 0..1)
+    return shape_functions[shape][0](x, *params)
+
+
+def shape_integral(shape, x_low, x_high, params):
+
+    # Exact integral of a shape function from x_low to x_high
+    antiderivative = shape_functions[shape][1]
+    return antiderivative(x_high, *params) - antiderivative(x_low, *params)
+
+
+def combined_value(components, x):
+
+    # Value of a weighted sum of shape functions; components is a list of (weight, shape, params)
+    return sum(weight * shape_value(shape, x, params) for weight, shape, params in components)
+
+
+def combined_integral(components, x_low, x_high):
+
+    # Exact integral of a weighted sum of shape functions from x_low to x_high
+    return sum(weight * shape_integral(shape, x_low, x_high, params) for weight, shape, params in components)
+
+
+def year_integral(components, T_min, T_max, t_low=None, t_high=None):
+
+    # Integral over the years t_low..t_high (default T_min..T_max) of a combined shape function that is defined
+    # on the scaled time axis x = (t - T_min) / (T_max - T_min): dt = (T_max - T_min) * dx
+    t_low = T_min if t_low is None else t_low
+    t_high = T_max if t_high is None else t_high
+    span = T_max - T_min
+    return span * combined_integral(components, (t_low - T_min) / span, (t_high - T_min) / span)